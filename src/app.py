@@ -4,13 +4,16 @@ Main application entry point.
 
 import logging
 import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from src.database.connection import Database
-from src.database.models import Symbol, AlertHistory, UserRule
+from src.database.models import Symbol, AlertHistory
 from src.database.repository import (
     UserRepository,
     WatchlistRepository,
@@ -19,7 +22,8 @@ from src.database.repository import (
     SymbolRepository,
 )
 from src.data.fetcher import StockDataFetcher
-from src.rules.engine import RuleEngine, AlertSeverity
+from src.rules.engine import RuleEngine, RuleSet, Alert
+from src.rules.types import _SEV_WARNING
 from src.notifiers.base import Notifier
 from src.notifiers.discord import DiscordNotifier
 from src.notifiers.email import EmailNotifier
@@ -34,6 +38,10 @@ class ModoApp:
         self,
         db: Database,
         alert_cooldown_hours: int = 24,
+        now: Callable[[], datetime] = datetime.now,
+        max_retries: int = 3,
+        retry_delay_seconds: float = 5,
+        retry_budget_seconds: float = 60,
     ):
         """
         Initialize Modo app.
@@ -41,9 +49,18 @@ class ModoApp:
         Args:
             db: Database instance
             alert_cooldown_hours: Hours before same alert can be sent again
+            now: Clock used for cooldown checks (injectable for tests)
+            max_retries: Retries for transient notification failures
+            retry_delay_seconds: Initial retry backoff, doubled per retry
+            retry_budget_seconds: Total time one run_check may spend waiting
+                on retries, shared by all alerts
         """
         self.db = db
         self.alert_cooldown_hours = alert_cooldown_hours
+        self.max_retries = max_retries
+        self.retry_delay_seconds = retry_delay_seconds
+        self.retry_budget_seconds = retry_budget_seconds
+        self.now = now
 
         # Initialize repositories
         self.user_repo = UserRepository(db)
@@ -59,14 +76,16 @@ class ModoApp:
     def run_check(self) -> None:
         """Run alert check for all users."""
         users = self.user_repo.list_all()
+        # One deadline for the whole run, so an outage can't stall the loop
+        retry_deadline = time.monotonic() + self.retry_budget_seconds
 
         for user in users:
             try:
-                self._check_user(user.id)
+                self._check_user(user.id, retry_deadline)
             except Exception as e:
                 logger.error(f"Error checking user {user.id}: {e}")
 
-    def _check_user(self, user_id: int) -> None:
+    def _check_user(self, user_id: int, retry_deadline: Optional[float] = None) -> None:
         """Check alerts for a single user."""
         user = self.user_repo.get_by_id(user_id)
         if not user:
@@ -78,7 +97,7 @@ class ModoApp:
             return
 
         # Get user's enabled rules
-        rules = self.rule_repo.get_enabled_rules(user_id)
+        rules = RuleSet(self.rule_repo.get_enabled_rules(user_id))
         if not rules:
             return
 
@@ -105,24 +124,28 @@ class ModoApp:
             return
 
         # Check each symbol
-        for symbol in watchlist:
-            self._check_symbol(user_id, symbol, rules, notifiers, email_notifiers)
+        try:
+            for symbol in watchlist:
+                self._check_symbol(
+                    user_id, symbol, rules, notifiers, email_notifiers, retry_deadline
+                )
+        finally:
+            for notifier in notifiers + email_notifiers:
+                notifier.close()
 
     def _check_symbol(
         self,
         user_id: int,
         symbol: Symbol,
-        rules: list[UserRule],
+        rules: RuleSet,
         notifiers: list[Notifier],
         email_notifiers: list[Notifier] | None = None,
+        retry_deadline: Optional[float] = None,
     ) -> None:
         """Check alerts for a single symbol."""
         try:
             # Apply only global rules (symbol_id=None) or rules specific to this symbol
-            applicable_rules = [
-                r for r in rules
-                if r.symbol_id is None or r.symbol_id == symbol.id
-            ]
+            applicable_rules = rules.for_symbol(symbol.id)
             if not applicable_rules:
                 return
 
@@ -131,18 +154,24 @@ class ModoApp:
             historical_data = self.fetcher.get_historical_data(symbol.ticker)
 
             # Evaluate rules
+            now = self.now()
             alerts = self.rule_engine.evaluate_rules(
-                applicable_rules, stock_data, historical_data
+                applicable_rules, stock_data, historical_data, now
             )
 
-            # Filter and send alerts
+            # Filter alerts, then send the symbol's alerts as one batch per notifier
+            batch: list[tuple[Alert, AlertHistory]] = []
+            batched_types: set[str] = set()
+
             for alert in alerts:
-                # Check cooldown
-                if self.alert_repo.has_recent_alert(
+                # Check cooldown; a rule type already in this batch will be in
+                # cooldown once the batch is delivered
+                if alert.rule_type in batched_types or self.alert_repo.has_recent_alert(
                     user_id=user_id,
                     symbol_id=symbol.id,
                     rule_type=alert.rule_type,
                     cooldown_hours=self.alert_cooldown_hours,
+                    now=now,
                 ):
                     continue
 
@@ -156,17 +185,42 @@ class ModoApp:
                 )
                 alert_record = self.alert_repo.create(alert_record)
 
-                # Send notifications
-                for notifier in notifiers:
-                    result = notifier.send(alert)
-                    if result.success:
-                        self.alert_repo.mark_notified(alert_record.id)
+                # Batch alerts some notifier will send (email takes WARNING and up)
+                if notifiers or (email_notifiers and alert.severity >= _SEV_WARNING):
+                    batch.append((alert, alert_record))
+                    batched_types.add(alert.rule_type)
 
-                if alert.severity >= AlertSeverity.WARNING:
-                    for notifier in (email_notifiers or []):
-                        result = notifier.send(alert)
-                        if result.success:
-                            self.alert_repo.mark_notified(alert_record.id)
+            # Send notifications
+            urgent = [(a, r) for a, r in batch if a.severity >= _SEV_WARNING]
+            for notifier in notifiers:
+                self._deliver(notifier, batch, now, retry_deadline)
+            for notifier in (email_notifiers or []):
+                self._deliver(notifier, urgent, now, retry_deadline)
 
         except Exception as e:
             logger.error(f"Error checking {symbol.ticker}: {e}")
+
+    def _deliver(
+        self,
+        notifier: Notifier,
+        batch: list[tuple[Alert, AlertHistory]],
+        now: datetime,
+        retry_deadline: Optional[float] = None,
+    ) -> None:
+        """Send alerts through a notifier, retrying transient failures until the deadline."""
+        if not batch:
+            return
+
+        results = notifier.send_batch_with_retry(
+            [alert for alert, _ in batch],
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay_seconds,
+            deadline=retry_deadline,
+        )
+        for (alert, alert_record), result in zip(batch, results):
+            if result.delivered:
+                self.alert_repo.mark_notified(alert_record.id, notified_at=now)
+            elif not result.success:
+                logger.warning(
+                    f"Failed to send {alert.ticker} alert via {result.channel}: {result.error}"
+                )
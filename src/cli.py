@@ -20,7 +20,6 @@ from src.database.repository import (
     RuleRepository,
 )
 from src.database.models import User, UserRule
-from src.data.symbols import SymbolSyncer
 
 
 def add_user(
@@ -86,6 +85,8 @@ def remove_from_watchlist(
 
 def sync_symbols(db: Database) -> dict:
     """Sync symbols from external sources."""
+    from src.data.symbols import SymbolSyncer
+
     syncer = SymbolSyncer()
     symbols = syncer.fetch_all_symbols()
 
@@ -297,6 +298,8 @@ def main():
         app = ModoApp(
             db=db,
             alert_cooldown_hours=config.advanced.alert_cooldown_hours,
+            max_retries=config.advanced.max_retries,
+            retry_delay_seconds=config.advanced.retry_delay_seconds,
         )
 
         if args.dry_run:
@@ -2,14 +2,19 @@
 Configuration loading and validation.
 """
 
+import io
 import os
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
 import yaml
 
+# Matches ${VAR_NAME} references in config values
+_ENV_VAR_RE = re.compile(r"\$\{([^}]+)\}")
+
 
 class ConfigValidationError(Exception):
     """Raised when configuration is invalid."""
@@ -105,16 +110,21 @@ class AppConfig:
     advanced: AdvancedConfig = field(default_factory=AdvancedConfig)
 
 
+@lru_cache(maxsize=32)
+def _parse_yaml(text: str) -> Any:
+    """
+    Parse YAML text, memoized on file contents.
+
+    The cached result is shared between calls and must not be mutated;
+    _substitute_env_vars() returns fresh containers for callers to modify.
+    """
+    return yaml.safe_load(text) or {}
+
+
 def _substitute_env_vars(value: Any) -> Any:
     """Substitute environment variables in string values."""
     if isinstance(value, str):
-        # Match ${VAR_NAME} pattern
-        pattern = r"\$\{([^}]+)\}"
-        matches = re.findall(pattern, value)
-        for var_name in matches:
-            env_value = os.environ.get(var_name, "")
-            value = value.replace(f"${{{var_name}}}", env_value)
-        return value
+        return _ENV_VAR_RE.sub(lambda m: os.environ.get(m.group(1), ""), value)
     elif isinstance(value, dict):
         return {k: _substitute_env_vars(v) for k, v in value.items()}
     elif isinstance(value, list):
@@ -149,12 +159,12 @@ def _validate_config(config_dict: dict[str, Any]) -> None:
     _validate_timezone(timezone)
 
 
-def load_config(config_path: str) -> AppConfig:
+def load_config(source: str | Path | io.TextIOBase) -> AppConfig:
     """
     Load configuration from YAML file.
 
     Args:
-        config_path: Path to configuration file
+        source: Path to configuration file, or an open text stream
 
     Returns:
         AppConfig instance
@@ -163,14 +173,17 @@ def load_config(config_path: str) -> AppConfig:
         ConfigValidationError: If configuration is invalid
         FileNotFoundError: If config file doesn't exist
     """
-    path = Path(config_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    if isinstance(source, io.TextIOBase):
+        text = source.read()
+    else:
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Configuration file not found: {source}")
+        text = path.read_text()
 
-    with open(path) as f:
-        raw_config = yaml.safe_load(f) or {}
+    raw_config = _parse_yaml(text)
 
-    # Substitute environment variables
+    # Substitute environment variables (copies the cached raw config)
     config_dict = _substitute_env_vars(raw_config)
 
     # Validate
@@ -4,6 +4,7 @@ Repository classes for CRUD operations.
 
 import json
 from datetime import datetime, timedelta
+from itertools import groupby
 from typing import Optional
 
 from .connection import Database
@@ -393,8 +394,8 @@ class AlertHistoryRepository:
             return None
         return self._row_to_alert(row)
 
-    def mark_notified(self, alert_id: int) -> None:
-        """Mark alert as notified."""
+    def mark_notified(self, alert_id: int, notified_at: Optional[datetime] = None) -> None:
+        """Mark alert as notified at the given time (defaults to now)."""
         cursor = self.db.connection.cursor()
         cursor.execute(
             """
@@ -402,7 +403,7 @@ class AlertHistoryRepository:
             SET notified_at = ?
             WHERE id = ?
             """,
-            (datetime.now().isoformat(), alert_id),
+            ((notified_at or datetime.now()).isoformat(), alert_id),
         )
         self.db.connection.commit()
 
@@ -412,10 +413,11 @@ class AlertHistoryRepository:
         symbol_id: int,
         rule_type: str,
         cooldown_hours: int = 24,
+        now: Optional[datetime] = None,
     ) -> bool:
         """Check if similar alert was sent recently."""
         cursor = self.db.connection.cursor()
-        cutoff = datetime.now() - timedelta(hours=cooldown_hours)
+        cutoff = (now or datetime.now()) - timedelta(hours=cooldown_hours)
         cursor.execute(
             """
             SELECT 1 FROM alert_history
@@ -446,6 +448,26 @@ class AlertHistoryRepository:
         )
         return [self._row_to_alert(row) for row in cursor.fetchall()]
 
+    def get_user_history_by_symbol(
+        self, user_id: int
+    ) -> dict[int, list[AlertHistory]]:
+        """Get alert history for a user, grouped by symbol ID (newest first)."""
+        cursor = self.db.connection.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM alert_history
+            WHERE user_id = ?
+            ORDER BY symbol_id, triggered_at DESC
+            """,
+            (user_id,),
+        )
+        return {
+            symbol_id: [self._row_to_alert(row) for row in rows]
+            for symbol_id, rows in groupby(
+                cursor.fetchall(), key=lambda row: row["symbol_id"]
+            )
+        }
+
     def _row_to_alert(self, row) -> AlertHistory:
         """Convert database row to AlertHistory."""
         return AlertHistory(
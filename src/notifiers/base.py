@@ -2,9 +2,11 @@
 Base notifier classes.
 """
 
+import inspect
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Any, Callable, Optional
 
 from src.rules.engine import Alert
 
@@ -16,6 +18,13 @@ class NotificationResult:
     success: bool
     channel: str
     error: Optional[str] = None
+    retryable: bool = False  # Transient failure (network, 5xx) worth retrying
+    suppressed: bool = False  # Skipped as a duplicate of a recently sent alert
+
+    @property
+    def delivered(self) -> bool:
+        """Whether the alert actually went out (suppressed duplicates did not)."""
+        return self.success and not self.suppressed
 
 
 class Notifier(ABC):
@@ -34,6 +43,24 @@ class Notifier(ABC):
         """
         pass
 
+    @classmethod
+    @abstractmethod
+    def from_config(cls, config: dict[str, Any]) -> "Notifier":
+        """
+        Create the notifier from its configuration dict.
+
+        Args:
+            config: Notifier configuration dict
+
+        Returns:
+            Notifier instance
+        """
+        pass
+
+    def close(self) -> None:
+        """Release any connections held by the notifier."""
+        pass
+
     def send_batch(self, alerts: list[Alert]) -> list[NotificationResult]:
         """
         Send multiple alerts.
@@ -46,12 +73,122 @@ class Notifier(ABC):
         """
         return [self.send(alert) for alert in alerts]
 
+    def send_with_retry(
+        self,
+        alert: Alert,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        max_delay: float = 300.0,
+        deadline: Optional[float] = None,
+    ) -> NotificationResult:
+        """
+        Send an alert, retrying transient failures with exponential backoff.
+
+        Args:
+            alert: Alert to send
+            max_retries: Maximum number of retries after the first attempt
+            retry_delay: Delay before the first retry; doubles on each retry
+            max_delay: Upper bound on a single retry delay
+            deadline: time.monotonic() value past which no retry is started,
+                so callers can share one retry budget across many sends
+
+        Returns:
+            NotificationResult of the last attempt
+        """
+        result = self.send(alert)
+        attempt = 0
+
+        while not result.success and result.retryable and attempt < max_retries:
+            if not self._wait_for_retry(attempt, retry_delay, max_delay, deadline):
+                break
+            attempt += 1
+            result = self.send(alert)
+
+        return result
+
+    def send_batch_with_retry(
+        self,
+        alerts: list[Alert],
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        max_delay: float = 300.0,
+        deadline: Optional[float] = None,
+    ) -> list[NotificationResult]:
+        """
+        Send alerts with send_batch, retrying only the transiently failed ones.
+
+        Each retry passes the still-failing alerts to send_batch together,
+        with the same backoff and deadline as send_with_retry.
+
+        Args:
+            alerts: Alerts to send
+            max_retries: Maximum number of retries after the first attempt
+            retry_delay: Delay before the first retry; doubles on each retry
+            max_delay: Upper bound on a single retry delay
+            deadline: time.monotonic() value past which no retry is started
+
+        Returns:
+            NotificationResult of the last attempt for each alert, in input order
+        """
+        results = self.send_batch(alerts) if alerts else []
+        attempt = 0
+
+        while attempt < max_retries:
+            pending = [i for i, r in enumerate(results) if not r.success and r.retryable]
+            if not pending or not self._wait_for_retry(attempt, retry_delay, max_delay, deadline):
+                break
+            attempt += 1
+            for i, result in zip(pending, self.send_batch([alerts[i] for i in pending])):
+                results[i] = result
+
+        return results
+
+    @staticmethod
+    def _wait_for_retry(
+        attempt: int, retry_delay: float, max_delay: float, deadline: Optional[float]
+    ) -> bool:
+        """Sleep out the backoff before a retry; False if it would pass the deadline."""
+        delay = min(retry_delay * 2**attempt, max_delay)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        return True
+
 
 class NotifierFactory:
     """Factory for creating notifier instances."""
 
-    @staticmethod
-    def create(config: dict[str, Any]) -> Notifier:
+    # Notifier type -> constructor taking the notifier config dict
+    _REGISTRY: dict[str, Callable[[dict[str, Any]], Notifier]] = {}
+
+    @classmethod
+    def register(cls, name: str) -> Callable[[type[Notifier]], type[Notifier]]:
+        """
+        Class decorator registering a notifier's from_config under a type name.
+
+        Args:
+            name: Notifier type as used in config ("type" key)
+
+        Returns:
+            Decorator that returns the class unchanged
+
+        Raises:
+            TypeError: If the class leaves send or from_config unimplemented
+        """
+        def decorator(notifier_cls: type[Notifier]) -> type[Notifier]:
+            if inspect.isabstract(notifier_cls):
+                missing = ", ".join(sorted(notifier_cls.__abstractmethods__))
+                raise TypeError(
+                    f"Cannot register notifier '{name}': {notifier_cls.__name__} "
+                    f"does not implement {missing}"
+                )
+            cls._REGISTRY[name] = notifier_cls.from_config
+            return notifier_cls
+
+        return decorator
+
+    @classmethod
+    def create(cls, config: dict[str, Any]) -> Notifier:
         """
         Create a notifier from configuration.
 
@@ -64,28 +201,12 @@ class NotifierFactory:
         Raises:
             ValueError: If notifier type is unknown
         """
-        notifier_type = config.get("type")
-
-        if notifier_type == "discord":
-            from .discord import DiscordNotifier
-
-            return DiscordNotifier(
-                webhook_url=config.get("webhook_url", ""),
-                mention_on_critical=config.get("mention_on_critical", True),
-                include_chart_link=config.get("include_chart_link", True),
-            )
-
-        elif notifier_type == "email":
-            from .email import EmailNotifier
-
-            return EmailNotifier(
-                smtp_host=config.get("smtp_host", ""),
-                smtp_port=config.get("smtp_port", 587),
-                smtp_user=config.get("smtp_user", ""),
-                smtp_password=config.get("smtp_password", ""),
-                from_address=config.get("from_address", ""),
-                to_addresses=config.get("to_addresses", []),
-            )
-
-        else:
-            raise ValueError(f"Unknown notifier type: {notifier_type}")
+        # Importing the built-in notifiers registers them
+        from . import discord, email  # noqa: F401
+
+        try:
+            factory = cls._REGISTRY[config.get("type")]
+        except KeyError:
+            raise ValueError(f"Unknown notifier type: {config.get('type')}") from None
+
+        return factory(config)
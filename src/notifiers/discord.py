@@ -2,15 +2,102 @@
 Discord webhook notifier.
 """
 
+import json
+import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, ClassVar, Mapping, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 from src.rules.engine import Alert, AlertSeverity
-from .base import Notifier, NotificationResult
+from src.rules.types import _SEV_CRITICAL
+from .base import Notifier, NotifierFactory, NotificationResult
+from .ratelimit import get_bucket
+
+# Connection pool size per host: one connection per concurrent send_batch
+# request (DiscordNotifier.MAX_CONCURRENT_SENDS)
+POOL_MAXSIZE = 4
+
+
+def _create_session() -> requests.Session:
+    """Create a keep-alive session with a pooled HTTPS adapter."""
+    session = requests.Session()
+    # Retries are handled by Notifier.send_with_retry, not by urllib3.
+    # pool_block makes concurrent bursts wait for a pooled connection
+    # instead of opening throwaway connections beyond the pool size.
+    adapter = HTTPAdapter(
+        pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=0, pool_block=True
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def _dump_json(payload: Any) -> bytes:
+    """Serialize a payload to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@dataclass(slots=True)
+class DiscordEmbedField:
+    """A name/value field shown inside an embed."""
+
+    name: str
+    value: str
+    inline: bool = True
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"name": self.name, "value": self.value, "inline": self.inline}
+
+
+@dataclass(slots=True)
+class DiscordEmbed:
+    """A single Discord embed."""
 
+    title: str
+    description: str
+    color: int
+    timestamp: str
+    fields: list[DiscordEmbedField] = field(default_factory=list)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "description": self.description,
+            "color": self.color,
+            "fields": [f.to_dict() for f in self.fields],
+            "timestamp": self.timestamp,
+        }
+
+
+@dataclass(slots=True)
+class DiscordPayload:
+    """A webhook message body."""
+
+    embeds: list[DiscordEmbed]
+    content: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the webhook JSON shape (content omitted when unset)."""
+        data: dict[str, Any] = {"embeds": [e.to_dict() for e in self.embeds]}
+        if self.content is not None:
+            data["content"] = self.content
+        return data
+
+
+@NotifierFactory.register("discord")
 class DiscordNotifier(Notifier):
     """Sends notifications via Discord webhook."""
 
@@ -19,11 +106,38 @@ class DiscordNotifier(Notifier):
     COLOR_WARNING = 0xFFA500  # Orange
     COLOR_CRITICAL = 0xFF0000  # Red
 
+    _SEVERITY_COLORS: ClassVar[Mapping[AlertSeverity, int]] = MappingProxyType({
+        AlertSeverity.INFO: COLOR_INFO,
+        AlertSeverity.WARNING: COLOR_WARNING,
+        AlertSeverity.CRITICAL: COLOR_CRITICAL,
+    })
+    _SEVERITY_EMOJI: ClassVar[Mapping[AlertSeverity, str]] = MappingProxyType({
+        AlertSeverity.INFO: "ℹ️",
+        AlertSeverity.WARNING: "⚠️",
+        AlertSeverity.CRITICAL: "🚨",
+    })
+    _JSON_HEADERS = {"Content-Type": "application/json"}
+
+    # Shared across instances so webhook calls reuse pooled connections
+    _session = _create_session()
+
+    # Upper bound on concurrent webhook requests in send_batch
+    MAX_CONCURRENT_SENDS = 4
+
+    # Discord accepts at most 10 embeds per webhook message
+    EMBEDS_PER_MESSAGE = 10
+
+    # Client-side budget per webhook URL, so bursts are throttled locally
+    # instead of discovering the limit through HTTP 429 responses
+    RATE_LIMIT_PER_SECOND = 5.0
+    RATE_LIMIT_BURST = 5
+
     def __init__(
         self,
         webhook_url: str,
         mention_on_critical: bool = True,
         include_chart_link: bool = True,
+        dedupe_window_s: float = 60.0,
     ):
         """
         Initialize Discord notifier.
@@ -32,16 +146,149 @@ class DiscordNotifier(Notifier):
             webhook_url: Discord webhook URL
             mention_on_critical: Whether to @here on critical alerts
             include_chart_link: Whether to include TradingView chart link
+            dedupe_window_s: Seconds during which an identical alert is
+                suppressed after a successful send (0 disables)
         """
         self.webhook_url = webhook_url
         self.mention_on_critical = mention_on_critical
         self.include_chart_link = include_chart_link
+        self.dedupe_window_s = dedupe_window_s
+        self._recent_hashes: OrderedDict[int, float] = OrderedDict()
+        self._recent_lock = threading.Lock()
+        # Serialized embed segments per severity, built on first use
+        self._embed_templates: dict[AlertSeverity, tuple[bytes, ...]] = {}
+        self._bucket = get_bucket(
+            webhook_url, self.RATE_LIMIT_PER_SECOND, self.RATE_LIMIT_BURST
+        )
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "DiscordNotifier":
+        """Create Discord notifier from a notifier config dict."""
+        return cls(
+            webhook_url=config.get("webhook_url", ""),
+            mention_on_critical=config.get("mention_on_critical", True),
+            include_chart_link=config.get("include_chart_link", True),
+        )
 
     def send(self, alert: Alert) -> NotificationResult:
         """Send alert to Discord."""
+        if self._should_suppress(alert):
+            return self._suppressed_result()
+
+        try:
+            body = self._render_payload([alert])
+        except Exception as e:
+            return NotificationResult(success=False, channel="discord", error=str(e))
+
+        result = self._send_payload(body)
+        if result.success:
+            self._remember([alert])
+        return result
+
+    def send_batch(
+        self,
+        alerts: list[Alert],
+        embeds_per_message: int = EMBEDS_PER_MESSAGE,
+    ) -> list[NotificationResult]:
+        """
+        Send multiple alerts, packing up to embeds_per_message embeds per POST.
+
+        Chunks are sent concurrently; every alert in a chunk shares the
+        result of that chunk's webhook call, in input order. Alerts that
+        duplicate a recently sent one (or an earlier one in the batch) are
+        skipped and reported as suppressed.
+        """
+        results: list[Optional[NotificationResult]] = [None] * len(alerts)
+        pending: list[int] = []
+        batch_hashes: set[int] = set()
+
+        for i, alert in enumerate(alerts):
+            h = self._alert_hash(alert)
+            if h in batch_hashes or self._should_suppress(alert):
+                results[i] = self._suppressed_result()
+            else:
+                batch_hashes.add(h)
+                pending.append(i)
+
+        chunks = [
+            pending[i:i + embeds_per_message]
+            for i in range(0, len(pending), embeds_per_message)
+        ]
+        alert_chunks = [[alerts[i] for i in chunk] for chunk in chunks]
+
+        if len(chunks) <= 1:
+            chunk_results = [self._send_chunk(chunk) for chunk in alert_chunks]
+        else:
+            workers = min(self.MAX_CONCURRENT_SENDS, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunk_results = list(executor.map(self._send_chunk, alert_chunks))
+
+        for chunk, alert_chunk, result in zip(chunks, alert_chunks, chunk_results):
+            if result.success:
+                self._remember(alert_chunk)
+            for i in chunk:
+                results[i] = result
+
+        return results
+
+    def _send_chunk(self, alerts: list[Alert]) -> NotificationResult:
+        """Send one webhook message carrying an embed per alert."""
         try:
-            payload = self._create_payload(alert)
-            response = self._send_webhook(payload)
+            body = self._render_payload(alerts)
+        except Exception as e:
+            return NotificationResult(success=False, channel="discord", error=str(e))
+        return self._send_payload(body)
+
+    @staticmethod
+    def _alert_hash(alert: Alert) -> int:
+        """Hash the fields that make two alerts duplicates of each other."""
+        # The message carries the rule's threshold, so alerts for different
+        # thresholds in the same severity band stay distinct
+        return hash((
+            alert.ticker,
+            alert.rule_type,
+            alert.severity,
+            round(alert.current_price, 2),
+            alert.message,
+        ))
+
+    def _should_suppress(self, alert: Alert) -> bool:
+        """Check whether an identical alert was sent within the dedupe window."""
+        if self.dedupe_window_s <= 0:
+            return False
+
+        now = time.monotonic()
+        with self._recent_lock:
+            self._evict_expired(now)
+            return self._alert_hash(alert) in self._recent_hashes
+
+    def _remember(self, alerts: list[Alert]) -> None:
+        """Record successfully sent alerts for deduplication."""
+        if self.dedupe_window_s <= 0:
+            return
+
+        now = time.monotonic()
+        with self._recent_lock:
+            for alert in alerts:
+                h = self._alert_hash(alert)
+                self._recent_hashes[h] = now
+                self._recent_hashes.move_to_end(h)
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop hashes older than the window (oldest entries come first)."""
+        cutoff = now - self.dedupe_window_s
+        recent = self._recent_hashes
+        while recent and next(iter(recent.values())) <= cutoff:
+            recent.popitem(last=False)
+
+    @staticmethod
+    def _suppressed_result() -> NotificationResult:
+        return NotificationResult(success=True, channel="discord", suppressed=True)
+
+    def _send_payload(self, body: bytes) -> NotificationResult:
+        """POST a serialized payload and translate the response into a result."""
+        try:
+            response = self._send_webhook(body)
 
             if response.ok:
                 return NotificationResult(success=True, channel="discord")
@@ -50,13 +297,24 @@ class DiscordNotifier(Notifier):
                     success=False,
                     channel="discord",
                     error=f"HTTP {response.status_code}: {response.text}",
+                    retryable=response.status_code == 429 or response.status_code >= 500,
                 )
 
         except requests.exceptions.ConnectionError as e:
+            # Includes ConnectTimeout: the request never reached Discord
             return NotificationResult(
                 success=False,
                 channel="discord",
                 error=f"Connection error: {str(e)}",
+                retryable=True,
+            )
+        except requests.exceptions.Timeout as e:
+            # A read timeout usually means Discord already accepted the POST;
+            # resending would post the alert twice
+            return NotificationResult(
+                success=False,
+                channel="discord",
+                error=f"Timeout: {str(e)}",
             )
         except Exception as e:
             return NotificationResult(
@@ -65,11 +323,13 @@ class DiscordNotifier(Notifier):
                 error=str(e),
             )
 
-    def _send_webhook(self, payload: dict[str, Any]) -> requests.Response:
-        """Send webhook with rate limit handling."""
-        response = requests.post(
+    def _send_webhook(self, body: bytes) -> requests.Response:
+        """Send webhook with rate limit handling (a 429 retry reuses the body)."""
+        self._bucket.acquire()
+        response = self._session.post(
             self.webhook_url,
-            json=payload,
+            data=body,
+            headers=self._JSON_HEADERS,
             timeout=10,
         )
 
@@ -77,79 +337,151 @@ class DiscordNotifier(Notifier):
         if response.status_code == 429:
             retry_after = response.headers.get("Retry-After", "1")
             time.sleep(float(retry_after))
-            response = requests.post(
+            self._bucket.acquire()
+            response = self._session.post(
                 self.webhook_url,
-                json=payload,
+                data=body,
+                headers=self._JSON_HEADERS,
                 timeout=10,
             )
 
+        self._apply_rate_limit_headers(response)
         return response
 
-    def _create_payload(self, alert: Alert) -> dict[str, Any]:
+    def _apply_rate_limit_headers(self, response: requests.Response) -> None:
+        """Pause the local bucket when Discord reports an exhausted budget."""
+        headers = response.headers
+        if headers.get("X-RateLimit-Remaining") != "0":
+            return
+
+        try:
+            reset_after = float(headers.get("X-RateLimit-Reset-After", "0"))
+        except (TypeError, ValueError):
+            return
+
+        if reset_after > 0:
+            self._bucket.pause(reset_after)
+
+    def _render_payload(self, alerts: list[Alert]) -> bytes:
+        """
+        Serialize a webhook message for alerts straight to JSON bytes.
+
+        Produces the same JSON as _create_batch_payload(alerts).to_dict(),
+        but splices per-alert values into cached embed templates instead of
+        encoding the whole structure.
+        """
+        embeds = b",".join([self._render_embed(alert) for alert in alerts])
+
+        if self.mention_on_critical and any(
+            alert.severity == _SEV_CRITICAL for alert in alerts
+        ):
+            return b'{"embeds":[' + embeds + b'],"content":"@here"}'
+        return b'{"embeds":[' + embeds + b"]}"
+
+    def _render_embed(self, alert: Alert) -> bytes:
+        """Serialize one embed by filling its severity's template."""
+        template = self._embed_templates.get(alert.severity)
+        if template is None:
+            template = self._embed_templates[alert.severity] = self._build_embed_template(
+                alert.severity
+            )
+
+        values = [
+            self._get_title(alert),
+            alert.message,
+            f"${alert.current_price:.2f}",
+            alert.rule_type.replace("_", " ").title(),
+        ]
+        if self.include_chart_link:
+            values.append(f"[TradingView]({self._chart_url(alert.ticker)})")
+        values.append(alert.triggered_at.isoformat())
+
+        # Each value is JSON-encoded on its own, so quotes and control
+        # characters are escaped exactly as a full encode would
+        parts = [template[0]]
+        for value, static in zip(values, template[1:]):
+            parts.append(_dump_json(value))
+            parts.append(static)
+        return b"".join(parts)
+
+    def _build_embed_template(self, severity: AlertSeverity) -> tuple[bytes, ...]:
+        """
+        Serialize an embed with placeholder values and split it at them.
+
+        Returns the static JSON segments surrounding each per-alert value,
+        in the order the values appear in the document.
+        """
+        slots = [f"__SLOT{i}__" for i in range(6 if self.include_chart_link else 5)]
+        fields = [
+            DiscordEmbedField(name="Current Price", value=slots[2]),
+            DiscordEmbedField(name="Rule", value=slots[3]),
+        ]
+        if self.include_chart_link:
+            fields.append(DiscordEmbedField(name="Chart", value=slots[4]))
+
+        embed = DiscordEmbed(
+            title=slots[0],
+            description=slots[1],
+            color=self._get_color(severity),
+            timestamp=slots[-1],
+            fields=fields,
+        )
+
+        rest = _dump_json(embed.to_dict())
+        segments = []
+        for slot in slots:
+            head, rest = rest.split(_dump_json(slot), 1)
+            segments.append(head)
+        segments.append(rest)
+        return tuple(segments)
+
+    def _create_payload(self, alert: Alert) -> DiscordPayload:
         """Create Discord webhook payload."""
-        payload: dict[str, Any] = {
-            "embeds": [self._create_embed(alert)],
-        }
+        return self._create_batch_payload([alert])
 
-        # Add @here mention for critical alerts
-        if self.mention_on_critical and alert.severity == AlertSeverity.CRITICAL:
-            payload["content"] = "@here"
+    def _create_batch_payload(self, alerts: list[Alert]) -> DiscordPayload:
+        """Create one webhook payload with an embed per alert."""
+        payload = DiscordPayload(embeds=[self._create_embed(alert) for alert in alerts])
+
+        # Add @here mention if any alert in the message is critical
+        if self.mention_on_critical and any(
+            alert.severity == _SEV_CRITICAL for alert in alerts
+        ):
+            payload.content = "@here"
 
         return payload
 
-    def _create_embed(self, alert: Alert) -> dict[str, Any]:
+    def _create_embed(self, alert: Alert) -> DiscordEmbed:
         """Create Discord embed for alert."""
-        color = self._get_color(alert.severity)
-        title = self._get_title(alert)
-
-        embed: dict[str, Any] = {
-            "title": title,
-            "description": alert.message,
-            "color": color,
-            "fields": [],
-            "timestamp": alert.triggered_at.isoformat(),
-        }
-
-        # Add price field
-        embed["fields"].append({
-            "name": "Current Price",
-            "value": f"${alert.current_price:.2f}",
-            "inline": True,
-        })
-
-        # Add rule type field
-        embed["fields"].append({
-            "name": "Rule",
-            "value": alert.rule_type.replace("_", " ").title(),
-            "inline": True,
-        })
+        fields = [
+            DiscordEmbedField(name="Current Price", value=f"${alert.current_price:.2f}"),
+            DiscordEmbedField(name="Rule", value=alert.rule_type.replace("_", " ").title()),
+        ]
 
         # Add chart link if enabled
         if self.include_chart_link:
-            chart_url = f"https://www.tradingview.com/symbols/{alert.ticker}"
-            embed["fields"].append({
-                "name": "Chart",
-                "value": f"[TradingView]({chart_url})",
-                "inline": True,
-            })
+            chart_url = self._chart_url(alert.ticker)
+            fields.append(DiscordEmbedField(name="Chart", value=f"[TradingView]({chart_url})"))
+
+        return DiscordEmbed(
+            title=self._get_title(alert),
+            description=alert.message,
+            color=self._get_color(alert.severity),
+            timestamp=alert.triggered_at.isoformat(),
+            fields=fields,
+        )
 
-        return embed
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _chart_url(ticker: str) -> str:
+        """Get TradingView chart URL for a ticker (cached per ticker)."""
+        return f"https://www.tradingview.com/symbols/{ticker}"
 
     def _get_color(self, severity: AlertSeverity) -> int:
         """Get embed color based on severity."""
-        if severity == AlertSeverity.CRITICAL:
-            return self.COLOR_CRITICAL
-        elif severity == AlertSeverity.WARNING:
-            return self.COLOR_WARNING
-        else:
-            return self.COLOR_INFO
+        return self._SEVERITY_COLORS.get(severity, self.COLOR_INFO)
 
     def _get_title(self, alert: Alert) -> str:
         """Get embed title based on alert."""
-        severity_emoji = {
-            AlertSeverity.INFO: "ℹ️",
-            AlertSeverity.WARNING: "⚠️",
-            AlertSeverity.CRITICAL: "🚨",
-        }
-        emoji = severity_emoji.get(alert.severity, "ℹ️")
+        emoji = self._SEVERITY_EMOJI.get(alert.severity, "ℹ️")
         return f"{emoji} {alert.ticker} Alert"
@@ -2,17 +2,49 @@
 Email SMTP notifier.
 """
 
+import html
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import socket
+from email.message import EmailMessage
+from typing import Any, Optional
 
 from src.rules.engine import Alert, AlertSeverity
-from .base import Notifier, NotificationResult
+from .base import Notifier, NotifierFactory, NotificationResult
 
 
+def _is_transient(error: Exception) -> bool:
+    """
+    Check whether an SMTP failure is worth retrying.
+
+    Dropped connections, timeouts and 4xx replies are transient. Any other
+    SMTP reply (5xx, refused recipients or sender) is permanent.
+    """
+    if isinstance(
+        error,
+        (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.timeout, ConnectionError),
+    ):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return False
+
+
+@NotifierFactory.register("email")
 class EmailNotifier(Notifier):
     """Sends notifications via email SMTP."""
 
+    _SEVERITY_PREFIX = {
+        AlertSeverity.INFO: "[Info]",
+        AlertSeverity.WARNING: "[Warning]",
+        AlertSeverity.CRITICAL: "[CRITICAL]",
+    }
+
+    _SEVERITY_COLORS = {
+        AlertSeverity.INFO: "#3498DB",
+        AlertSeverity.WARNING: "#FFA500",
+        AlertSeverity.CRITICAL: "#FF0000",
+    }
+
     def __init__(
         self,
         smtp_host: str,
@@ -21,6 +53,7 @@ class EmailNotifier(Notifier):
         smtp_password: str,
         from_address: str,
         to_addresses: list[str],
+        use_starttls: bool = True,
     ):
         """
         Initialize email notifier.
@@ -28,10 +61,11 @@ class EmailNotifier(Notifier):
         Args:
             smtp_host: SMTP server hostname
             smtp_port: SMTP server port
-            smtp_user: SMTP username
+            smtp_user: SMTP username (login is skipped when empty)
             smtp_password: SMTP password
             from_address: Sender email address
             to_addresses: List of recipient email addresses
+            use_starttls: Whether to upgrade the connection with STARTTLS
         """
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -39,16 +73,35 @@ class EmailNotifier(Notifier):
         self.smtp_password = smtp_password
         self.from_address = from_address
         self.to_addresses = to_addresses
+        self.use_starttls = use_starttls
+        self._to_header = ", ".join(to_addresses)
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "EmailNotifier":
+        """Create email notifier from a notifier config dict."""
+        return cls(
+            smtp_host=config.get("smtp_host", ""),
+            smtp_port=config.get("smtp_port", 587),
+            smtp_user=config.get("smtp_user", ""),
+            smtp_password=config.get("smtp_password", ""),
+            from_address=config.get("from_address", ""),
+            to_addresses=config.get("to_addresses", []),
+            use_starttls=config.get("use_starttls", True),
+        )
 
     def send(self, alert: Alert) -> NotificationResult:
         """Send alert via email."""
         try:
             message = self._create_message(alert)
 
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(message)
+            # All recipients share one envelope: the relay fans it out
+            try:
+                self._connect().send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # Cached connection went stale; reconnect and retry once
+                self._smtp = None
+                self._connect().send_message(message)
 
             return NotificationResult(success=True, channel="email")
 
@@ -63,33 +116,52 @@ class EmailNotifier(Notifier):
                 success=False,
                 channel="email",
                 error=f"SMTP error: {str(e)}",
+                retryable=_is_transient(e),
             )
 
-    def _create_message(self, alert: Alert) -> MIMEMultipart:
+    def close(self) -> None:
+        """Close the cached SMTP connection, if any."""
+        if self._smtp is None:
+            return
+
+        try:
+            self._smtp.quit()
+        except smtplib.SMTPException:
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+    def _connect(self) -> smtplib.SMTP:
+        """Get the cached SMTP connection, opening and authenticating it once."""
+        if self._smtp is None:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+            try:
+                if self.use_starttls:
+                    server.starttls()
+                if self.smtp_user:
+                    server.login(self.smtp_user, self.smtp_password)
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+        return self._smtp
+
+    def _create_message(self, alert: Alert) -> EmailMessage:
         """Create email message."""
-        message = MIMEMultipart("alternative")
+        message = EmailMessage()
         message["Subject"] = self._create_subject(alert)
         message["From"] = self.from_address
-        message["To"] = ", ".join(self.to_addresses)
-
-        # Plain text version
-        text_body = self._create_text_body(alert)
-        message.attach(MIMEText(text_body, "plain"))
+        message["To"] = self._to_header
 
-        # HTML version
-        html_body = self._create_body(alert)
-        message.attach(MIMEText(html_body, "html"))
+        # Plain text version, with HTML as the preferred alternative
+        message.set_content(self._create_text_body(alert))
+        message.add_alternative(self._create_body(alert), subtype="html")
 
         return message
 
     def _create_subject(self, alert: Alert) -> str:
         """Create email subject."""
-        severity_prefix = {
-            AlertSeverity.INFO: "[Info]",
-            AlertSeverity.WARNING: "[Warning]",
-            AlertSeverity.CRITICAL: "[CRITICAL]",
-        }
-        prefix = severity_prefix.get(alert.severity, "[Alert]")
+        prefix = self._SEVERITY_PREFIX.get(alert.severity, "[Alert]")
         return f"[MODO]{prefix} {alert.ticker}"
 
     def _create_text_body(self, alert: Alert) -> str:
@@ -108,12 +180,11 @@ Time: {alert.triggered_at.strftime("%Y-%m-%d %H:%M:%S")}
 
     def _create_body(self, alert: Alert) -> str:
         """Create HTML email body."""
-        severity_color = {
-            AlertSeverity.INFO: "#3498DB",
-            AlertSeverity.WARNING: "#FFA500",
-            AlertSeverity.CRITICAL: "#FF0000",
-        }
-        color = severity_color.get(alert.severity, "#3498DB")
+        color = self._SEVERITY_COLORS.get(alert.severity, "#3498DB")
+        # Escape alert-provided text before interpolating it into HTML
+        ticker = html.escape(alert.ticker)
+        message = html.escape(alert.message)
+        rule = html.escape(alert.rule_type.replace("_", " ").title())
 
         return f"""
 <!DOCTYPE html>
@@ -137,15 +208,15 @@ Time: {alert.triggered_at.strftime("%Y-%m-%d %H:%M:%S")}
 </head>
 <body>
     <div class="alert-box">
-        <div class="ticker">{alert.ticker}</div>
+        <div class="ticker">{ticker}</div>
         <div class="price">Current Price: ${alert.current_price:.2f}</div>
-        <div class="message">{alert.message}</div>
+        <div class="message">{message}</div>
         <div class="meta">
-            Rule: {alert.rule_type.replace("_", " ").title()}<br>
+            Rule: {rule}<br>
             Time: {alert.triggered_at.strftime("%Y-%m-%d %H:%M:%S")}
         </div>
         <div class="chart-link">
-            <a href="https://www.tradingview.com/symbols/{alert.ticker}">
+            <a href="https://www.tradingview.com/symbols/{ticker}">
                 View Chart on TradingView →
             </a>
         </div>
@@ -0,0 +1,67 @@
+"""
+Client-side rate limiting for notifiers.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a request is allowed."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens refilled per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until it becomes available."""
+        with self._lock:
+            self._refill()
+            # Tokens may go negative: each caller reserves its slot and
+            # sleeps outside the lock until that slot is due.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Withhold tokens for the given duration (e.g. from server reset headers)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(key: str, rate: float, capacity: int) -> TokenBucket:
+    """Get the shared bucket for a key (e.g. webhook URL), creating it if needed."""
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(rate=rate, capacity=capacity)
+        return bucket
+
+
+def reset_buckets() -> None:
+    """Drop all shared buckets."""
+    with _buckets_lock:
+        _buckets.clear()
@@ -0,0 +1,100 @@
+"""
+Column-array views of market data for batch rule evaluation.
+
+Requires NumPy, installed with the "batch" extra.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.data.fetcher import StockData, HistoricalData
+
+
+@dataclass
+class MarketBatch:
+    """
+    Structure-of-arrays view of stock and historical data for many tickers.
+
+    Index i of every array describes stock_data[i] / historical_data[i].
+    Historical columns are 0 where has_history is False.
+    """
+
+    stock_data: list[StockData]
+    historical_data: list[Optional[HistoricalData]]
+    current_price: np.ndarray
+    daily_change_pct: np.ndarray
+    volume: np.ndarray
+    has_history: np.ndarray
+    monthly_high: np.ndarray
+    monthly_low: np.ndarray
+    avg_volume_20d: np.ndarray
+
+    @classmethod
+    def from_data(
+        cls,
+        stock_data: list[StockData],
+        historical_data: list[Optional[HistoricalData]],
+    ) -> "MarketBatch":
+        """
+        Build the column arrays from per-ticker data.
+
+        Args:
+            stock_data: Current data per ticker
+            historical_data: Historical data per ticker (None when unavailable)
+
+        Returns:
+            MarketBatch over the given tickers
+        """
+        if len(stock_data) != len(historical_data):
+            raise ValueError("stock_data and historical_data must have the same length")
+
+        price = np.array([sd.current_price for sd in stock_data], dtype=np.float64)
+        previous_close = np.array([sd.previous_close for sd in stock_data], dtype=np.float64)
+        history = [
+            (hd.monthly_high, hd.monthly_low, hd.avg_volume_20d) if hd else (0.0, 0.0, 0.0)
+            for hd in historical_data
+        ]
+        columns = np.array(history, dtype=np.float64).reshape(len(stock_data), 3)
+
+        return cls(
+            stock_data=stock_data,
+            historical_data=historical_data,
+            current_price=price,
+            daily_change_pct=_pct_change(price, previous_close),
+            volume=np.array([sd.volume for sd in stock_data], dtype=np.float64),
+            has_history=np.array([hd is not None for hd in historical_data], dtype=bool),
+            monthly_high=columns[:, 0],
+            monthly_low=columns[:, 1],
+            avg_volume_20d=columns[:, 2],
+        )
+
+    def __len__(self) -> int:
+        return len(self.stock_data)
+
+    def mask(self, value: bool) -> np.ndarray:
+        """Boolean mask with the same value for every ticker."""
+        return np.full(len(self), value, dtype=bool)
+
+    def rise_from_low(self) -> np.ndarray:
+        """Percentage rise from the monthly low per ticker (as HistoricalData.rise_from_low)."""
+        return _pct_change(self.current_price, self.monthly_low)
+
+    def volume_ratio(self) -> np.ndarray:
+        """Volume over the 20-day average per ticker (as HistoricalData.volume_ratio)."""
+        return _ratio(self.volume, self.avg_volume_20d)
+
+
+def _pct_change(value: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Percentage change from base, 0 where base is 0 (as StockData/HistoricalData do)."""
+    out = np.zeros_like(value)
+    np.divide(value - base, base, out=out, where=base != 0)
+    return out * 100
+
+
+def _ratio(value: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """value / base, 0 where base is 0 (as HistoricalData.volume_ratio does)."""
+    out = np.zeros_like(value)
+    np.divide(value, base, out=out, where=base != 0)
+    return out
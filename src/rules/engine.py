@@ -2,7 +2,11 @@
 Rule evaluation engine.
 """
 
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
 
 from src.database.models import UserRule
 from src.data.fetcher import StockData, HistoricalData
@@ -19,17 +23,229 @@ from .types import (
 )
 
 # Re-export for convenience
-__all__ = ["RuleEngine", "Alert", "AlertSeverity"]
+__all__ = ["RuleEngine", "RuleSet", "Alert", "AlertSeverity"]
+
+# Cheap necessary conditions per rule type: when a prefilter returns False the
+# rule cannot fire for this data, so evaluate() is skipped entirely.
+Prefilter = Callable[[Any, StockData, Optional[HistoricalData]], bool]
+
+
+def _monthly_high_drop_may_fire(
+    rule: MonthlyHighDropRule, sd: StockData, hd: Optional[HistoricalData]
+) -> bool:
+    return hd is not None and rule.may_trigger(sd.current_price, hd.monthly_high)
+
+
+def _monthly_low_rise_may_fire(
+    rule: MonthlyLowRiseRule, sd: StockData, hd: Optional[HistoricalData]
+) -> bool:
+    # Thresholds are sorted ascending, so the first is the easiest to hit
+    return (
+        hd is not None
+        and bool(rule.thresholds)
+        and hd.rise_from_low(sd.current_price) >= rule.thresholds[0]
+    )
+
+
+def _daily_change_may_fire(
+    rule: DailyChangeRule, sd: StockData, hd: Optional[HistoricalData]
+) -> bool:
+    # Every direction requires at least this magnitude of change
+    return abs(sd.daily_change_pct) >= rule.threshold
+
+
+def _volume_spike_may_fire(
+    rule: VolumeSpikeRule, sd: StockData, hd: Optional[HistoricalData]
+) -> bool:
+    return hd is not None and hd.volume_ratio(sd.volume) >= rule.multiplier
+
+
+_DEFAULT_DROP_THRESHOLDS = [-5, -10, -15, -20]
+
+
+# Rule constructors from UserRule.parameters, applying per-type defaults
+def _monthly_high_drop(params: dict[str, Any]) -> Rule:
+    return MonthlyHighDropRule(thresholds=params.get("thresholds", _DEFAULT_DROP_THRESHOLDS))
+
+
+def _monthly_low_rise(params: dict[str, Any]) -> Rule:
+    return MonthlyLowRiseRule(thresholds=params.get("thresholds", [5, 7, 10]))
+
+
+def _price_target(params: dict[str, Any]) -> Rule:
+    return PriceTargetRule(
+        reference_price=params["reference_price"],
+        thresholds=params.get("thresholds", [-10, -7, -5, -3, 3, 5, 7, 10]),
+    )
+
+
+def _daily_change(params: dict[str, Any]) -> Rule:
+    return DailyChangeRule(
+        threshold=params.get("threshold", 5.0),
+        direction=params.get("direction", "both"),
+    )
+
+
+def _volume_spike(params: dict[str, Any]) -> Rule:
+    return VolumeSpikeRule(
+        multiplier=params.get("multiplier", 3.0),
+        average_days=params.get("average_days", 20),
+    )
+
+
+def _custom(params: dict[str, Any]) -> Rule:
+    return CustomRule(
+        name=params.get("name", "Custom Rule"),
+        condition=params.get("condition", "False"),
+    )
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert rule parameters into a hashable cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass
+class CompiledRule(UserRule):
+    """A UserRule produced by RuleEngine.compile_rules, carrying its built Rule."""
+
+    rule: Optional[Rule] = field(default=None, repr=False, compare=False)
+
+
+class RuleSet:
+    """
+    A user's rules, partitioned once at load time.
+
+    Disabled rules are dropped up front and per-symbol selections are
+    cached, so evaluation never re-filters the full rule list.
+    """
+
+    def __init__(self, rules: list[UserRule]):
+        """
+        Initialize rule set.
+
+        Args:
+            rules: User rules, enabled or not
+        """
+        self.enabled = [r for r in rules if r.enabled]
+        self._by_symbol: dict[Optional[int], list[UserRule]] = {}
+
+    def __len__(self) -> int:
+        return len(self.enabled)
+
+    def for_symbol(self, symbol_id: Optional[int]) -> list[UserRule]:
+        """
+        Get enabled rules applying to a symbol: global rules plus its own.
+
+        Args:
+            symbol_id: Symbol ID
+
+        Returns:
+            Applicable rules in their original order, with monthly_high_drop
+            rules merged by RuleEngine.compile_rules (computed once per symbol)
+        """
+        rules = self._by_symbol.get(symbol_id)
+        if rules is None:
+            rules = self._by_symbol[symbol_id] = RuleEngine.compile_rules([
+                r for r in self.enabled
+                if r.symbol_id is None or r.symbol_id == symbol_id
+            ])
+        return rules
 
 
 class RuleEngine:
     """Evaluates rules against stock data."""
 
+    _RULE_TYPES: dict[str, Callable[[dict[str, Any]], Rule]] = {
+        "monthly_high_drop": _monthly_high_drop,
+        "monthly_low_rise": _monthly_low_rise,
+        "price_target": _price_target,
+        "daily_change": _daily_change,
+        "volume_spike": _volume_spike,
+        "custom": _custom,
+    }
+
+    _PREFILTERS: dict[str, Prefilter] = {
+        "monthly_high_drop": _monthly_high_drop_may_fire,
+        "monthly_low_rise": _monthly_low_rise_may_fire,
+        "daily_change": _daily_change_may_fire,
+        "volume_spike": _volume_spike_may_fire,
+    }
+
+    def __init__(self, rule_cache_size: int = 1024):
+        """
+        Initialize rule engine.
+
+        Args:
+            rule_cache_size: Maximum number of distinct rule configurations
+                kept built; the least recently used is evicted beyond it
+        """
+        self.rule_cache_size = rule_cache_size
+        # Rule instances keyed by (rule_type, frozen parameters), shared
+        # across tickers and users with identical rule configuration
+        self._rule_cache: OrderedDict[tuple[str, Hashable], Rule] = OrderedDict()
+
+    @staticmethod
+    def compile_rules(rules: list[UserRule]) -> list[UserRule]:
+        """
+        Merge the enabled monthly_high_drop rules into one multi-threshold rule.
+
+        The merged rule takes the place (and ID) of the first of them, so the
+        drop from the monthly high is computed once per evaluation however
+        many drop rules apply. Every threshold is kept, and the merged rule
+        emits its alerts source rule by source rule, each rule's thresholds
+        descending, exactly as evaluating the rules separately would. Only
+        the position of the drop alerts relative to other rule types changes:
+        they all come where the first drop rule was. Per rule type, the alert
+        sequence (and so which alert passes the per-type cooldown first) is
+        unchanged.
+
+        Args:
+            rules: Rules applying to a single symbol
+
+        Returns:
+            Rules to pass to evaluate_rules
+        """
+        drop_rules = [r for r in rules if r.enabled and r.rule_type == "monthly_high_drop"]
+        if len(drop_rules) < 2:
+            return rules
+
+        thresholds: list[float] = []
+        for user_rule in drop_rules:
+            rule_thresholds = user_rule.parameters.get("thresholds", _DEFAULT_DROP_THRESHOLDS)
+            thresholds.extend(sorted(rule_thresholds, reverse=True))
+
+        first = drop_rules[0]
+        # Built here rather than through _RULE_TYPES: keep_order is internal
+        # and must not become a setting of stored rule parameters
+        merged = CompiledRule(
+            id=first.id,
+            user_id=first.user_id,
+            rule_type="monthly_high_drop",
+            parameters={"thresholds": thresholds},
+            symbol_id=first.symbol_id,
+            rule=MonthlyHighDropRule(thresholds, keep_order=True),
+        )
+        merged_ids = {id(r) for r in drop_rules}
+
+        compiled = []
+        for user_rule in rules:
+            if user_rule is first:
+                compiled.append(merged)
+            elif id(user_rule) not in merged_ids:
+                compiled.append(user_rule)
+        return compiled
+
     def evaluate_rules(
         self,
         rules: list[UserRule],
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         """
         Evaluate multiple rules against stock data.
@@ -38,69 +254,157 @@ class RuleEngine:
             rules: List of user rules to evaluate
             stock_data: Current stock data
             historical_data: Historical data for the stock
+            now: Timestamp shared by all triggered alerts (defaults to datetime.now())
 
         Returns:
             List of all triggered alerts
         """
+        if now is None:
+            now = datetime.now()
         alerts = []
+        extend = alerts.extend
 
         for user_rule in rules:
             if not user_rule.enabled:
                 continue
 
             try:
-                rule = self.create_rule(user_rule)
-                rule_alerts = rule.evaluate(stock_data, historical_data)
-                alerts.extend(rule_alerts)
+                rule = self._get_rule(user_rule)
+
+                prefilter = self._PREFILTERS.get(user_rule.rule_type)
+                if prefilter is not None and not prefilter(rule, stock_data, historical_data):
+                    continue
+
+                extend(rule.evaluate(stock_data, historical_data, now))
             except ValueError:
                 # Skip invalid rules
                 continue
 
         return alerts
 
-    def create_rule(self, user_rule: UserRule) -> Rule:
+    def evaluate_rules_batch(
+        self,
+        rules: list[UserRule],
+        stock_data_list: list[StockData],
+        historical_data_list: list[Optional[HistoricalData]],
+        now: Optional[datetime] = None,
+        max_workers: int = 1,
+    ) -> list[list[Alert]]:
         """
-        Create a Rule instance from UserRule.
+        Evaluate rules against many tickers at once.
+
+        Each rule first computes a vectorized mask of tickers it may trigger
+        for; evaluate() then only runs for those tickers. The result for each
+        ticker equals evaluate_rules(rules, stock_data, historical_data).
+
+        With max_workers > 1 the tickers are split into contiguous shards
+        evaluated on a thread pool; NumPy releases the GIL for the mask
+        computations, so shards overlap there.
+
+        Requires NumPy (the "batch" extra), imported on first use so the
+        per-symbol evaluate_rules path does not depend on it.
 
         Args:
-            user_rule: User rule configuration
+            rules: List of user rules to evaluate
+            stock_data_list: Current stock data per ticker
+            historical_data_list: Historical data per ticker (None when unavailable)
+            now: Timestamp shared by all triggered alerts (defaults to datetime.now())
+            max_workers: Number of shards to evaluate concurrently
 
         Returns:
-            Appropriate Rule instance
-
-        Raises:
-            ValueError: If rule type is unknown
+            Triggered alerts per ticker, in input order
         """
-        rule_type = user_rule.rule_type
-        params = user_rule.parameters
+        if now is None:
+            now = datetime.now()
+
+        # Build rules once, up front, so shards share them and never race on
+        # the rule cache
+        built_rules = []
+        for user_rule in rules:
+            if not user_rule.enabled:
+                continue
+            try:
+                built_rules.append(self._get_rule(user_rule))
+            except ValueError:
+                # Skip invalid rules
+                continue
 
-        if rule_type == "monthly_high_drop":
-            thresholds = params.get("thresholds", [-5, -10, -15, -20])
-            return MonthlyHighDropRule(thresholds=thresholds)
+        count = len(stock_data_list)
+        if max_workers <= 1 or count < 2:
+            return self._evaluate_shard(built_rules, stock_data_list, historical_data_list, now)
 
-        elif rule_type == "monthly_low_rise":
-            thresholds = params.get("thresholds", [5, 7, 10])
-            return MonthlyLowRiseRule(thresholds=thresholds)
+        size = -(-count // max_workers)  # ceil division
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            shards = executor.map(
+                lambda start: self._evaluate_shard(
+                    built_rules,
+                    stock_data_list[start:start + size],
+                    historical_data_list[start:start + size],
+                    now,
+                ),
+                range(0, count, size),
+            )
+            return [alerts for shard in shards for alerts in shard]
 
-        elif rule_type == "price_target":
-            reference_price = params["reference_price"]
-            thresholds = params.get("thresholds", [-10, -7, -5, -3, 3, 5, 7, 10])
-            return PriceTargetRule(reference_price=reference_price, thresholds=thresholds)
+    @staticmethod
+    def _evaluate_shard(
+        rules: list[Rule],
+        stock_data_list: list[StockData],
+        historical_data_list: list[Optional[HistoricalData]],
+        now: datetime,
+    ) -> list[list[Alert]]:
+        """Evaluate built rules against one contiguous shard of tickers."""
+        from .batch import MarketBatch
 
-        elif rule_type == "daily_change":
-            threshold = params.get("threshold", 5.0)
-            direction = params.get("direction", "both")
-            return DailyChangeRule(threshold=threshold, direction=direction)
+        batch = MarketBatch.from_data(stock_data_list, historical_data_list)
+        results: list[list[Alert]] = [[] for _ in range(len(batch))]
 
-        elif rule_type == "volume_spike":
-            multiplier = params.get("multiplier", 3.0)
-            average_days = params.get("average_days", 20)
-            return VolumeSpikeRule(multiplier=multiplier, average_days=average_days)
+        for rule in rules:
+            try:
+                candidates = rule.evaluate_batch(batch).nonzero()[0]
+            except ValueError:
+                continue
 
-        elif rule_type == "custom":
-            name = params.get("name", "Custom Rule")
-            condition = params.get("condition", "False")
-            return CustomRule(name=name, condition=condition)
+            for i in candidates.tolist():
+                try:
+                    results[i].extend(
+                        rule.evaluate(batch.stock_data[i], batch.historical_data[i], now)
+                    )
+                except ValueError:
+                    continue
 
+        return results
+
+    def _get_rule(self, user_rule: UserRule) -> Rule:
+        """Get a cached Rule instance for the user rule's configuration."""
+        if isinstance(user_rule, CompiledRule):
+            return user_rule.rule
+
+        key = (user_rule.rule_type, _freeze(user_rule.parameters))
+        cache = self._rule_cache
+        rule = cache.get(key)
+        if rule is None:
+            rule = cache[key] = self.create_rule(user_rule)
+            if len(cache) > self.rule_cache_size:
+                cache.popitem(last=False)
         else:
-            raise ValueError(f"Unknown rule type: {rule_type}")
+            cache.move_to_end(key)
+        return rule
+
+    def create_rule(self, user_rule: UserRule) -> Rule:
+        """
+        Create a Rule instance from UserRule.
+
+        Args:
+            user_rule: User rule configuration
+
+        Returns:
+            Appropriate Rule instance
+
+        Raises:
+            ValueError: If rule type is unknown
+        """
+        factory = self._RULE_TYPES.get(user_rule.rule_type)
+        if factory is None:
+            raise ValueError(f"Unknown rule type: {user_rule.rule_type}")
+        return factory(user_rule.parameters)
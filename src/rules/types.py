@@ -3,19 +3,28 @@ Rule type implementations.
 """
 
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum
-from typing import Optional, Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
+import ast
 import logging
-import re
+import math
+import operator
 
-from simpleeval import simple_eval, InvalidExpression
+from simpleeval import safe_power
 
 from src.data.fetcher import StockData, HistoricalData
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    # NumPy is only needed by the batch path (the "batch" extra)
+    import numpy as np
+
+    from .batch import MarketBatch
 
+logger = logging.getLogger(__name__)
 
 class AlertSeverity(IntEnum):
     """Alert severity levels."""
@@ -25,7 +34,37 @@ class AlertSeverity(IntEnum):
     CRITICAL = 3
 
 
-@dataclass
+# Members bound once for per-alert code paths: a module global load is much
+# cheaper than attribute lookup on the Enum class
+_SEV_INFO = AlertSeverity.INFO
+_SEV_WARNING = AlertSeverity.WARNING
+_SEV_CRITICAL = AlertSeverity.CRITICAL
+
+# Slack added to MonthlyHighDropRule's ratio limit to absorb rounding
+# differences from the percentage computation
+_RATIO_MARGIN = 1e-9
+
+# Severity bands as (bound, severity), most severe first; values that pass
+# no bound are INFO. Drop bands match thresholds at or below the bound, the
+# others match values at or above it.
+_DROP_SEVERITY_BANDS = (
+    (-15.0, AlertSeverity.CRITICAL),
+    (-10.0, AlertSeverity.WARNING),
+)
+_RISE_SEVERITY_BANDS = (
+    (10.0, AlertSeverity.CRITICAL),
+    (7.0, AlertSeverity.WARNING),
+)
+_TARGET_SEVERITY_BANDS = (
+    (10.0, AlertSeverity.CRITICAL),
+    (5.0, AlertSeverity.WARNING),
+)
+_VOLUME_SEVERITY_BANDS = (
+    (5.0, AlertSeverity.WARNING),
+)
+
+
+@dataclass(slots=True)
 class Alert:
     """Alert generated by a rule."""
 
@@ -41,79 +80,149 @@ class Alert:
 class Rule(ABC):
     """Base class for all rules."""
 
+    __slots__ = ()
+
     @abstractmethod
     def evaluate(
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         """
         Evaluate the rule against stock data.
 
+        Args:
+            stock_data: Current stock data
+            historical_data: Historical data for the stock
+            now: Timestamp for triggered alerts (defaults to datetime.now())
+
         Returns:
             List of alerts if rule conditions are met, empty list otherwise.
         """
         pass
 
+    def evaluate_batch(self, batch: "MarketBatch") -> "np.ndarray":
+        """
+        Find the tickers in a batch for which this rule may trigger.
+
+        Rules override this with a vectorized check; evaluate() is then
+        only called for tickers where the returned mask is True.
+
+        Returns:
+            Boolean mask over the batch's tickers
+        """
+        return batch.mask(True)
+
 
 class MonthlyHighDropRule(Rule):
     """Rule for detecting drops from monthly high."""
 
-    def __init__(self, thresholds: list[float]):
+    __slots__ = ("thresholds", "_given", "_positions", "_neg_thresholds", "_ratio_limit")
+
+    def __init__(self, thresholds: list[float], keep_order: bool = False):
         """
         Initialize monthly high drop rule.
 
         Args:
             thresholds: List of drop percentages to alert on (e.g., [-5, -10, -15, -20])
+            keep_order: Emit alerts in the order the thresholds are given instead
+                of descending (used for rules merged by RuleEngine.compile_rules)
+        """
+        order = sorted(range(len(thresholds)), key=thresholds.__getitem__, reverse=True)
+        self.thresholds = [thresholds[i] for i in order]  # Sorted descending
+        # Given position of each sorted threshold, to restore the given order
+        self._given = list(thresholds) if keep_order else None
+        self._positions = order if keep_order else None
+        # Negated thresholds in ascending order, for bisecting the triggered prefix
+        self._neg_thresholds = [-t for t in self.thresholds]
+        # Price / monthly-high ratio needed to reach the easiest threshold,
+        # loosened by a tiny margin so the ratio check can over-approximate
+        # the percentage comparison but never reject a real trigger
+        self._ratio_limit = (
+            1 + self.thresholds[0] / 100 + _RATIO_MARGIN if self.thresholds else None
+        )
+
+    def may_trigger(self, current_price: float, monthly_high: float) -> bool:
         """
-        self.thresholds = sorted(thresholds, reverse=True)  # Sort descending
+        Cheaply check whether evaluate() could trigger, without division.
+
+        False means no threshold can fire; True may include rare false
+        positives, which evaluate() then rejects.
+        """
+        if self._ratio_limit is None:
+            return False
+        return monthly_high <= 0 or current_price <= monthly_high * self._ratio_limit
 
     def evaluate(
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         if historical_data is None:
             return []
 
         drop_pct = historical_data.drop_from_high(stock_data.current_price)
+        if math.isnan(drop_pct):
+            return []
+
+        # drop_pct <= threshold holds exactly for a prefix of the descending
+        # thresholds; find its length with one binary search
+        triggered = bisect_right(self._neg_thresholds, -drop_pct)
         alerts = []
+        append = alerts.append
+        if now is None:
+            now = datetime.now()
+        # Only the threshold differs between alerts; copy the rest
+        base_metadata = {
+            "threshold": None,
+            "monthly_high": historical_data.monthly_high,
+            "drop_pct": drop_pct,
+        }
 
-        for threshold in self.thresholds:
-            if drop_pct <= threshold:
-                severity = self._get_severity(threshold)
-                alerts.append(
-                    Alert(
-                        ticker=stock_data.ticker,
-                        rule_type="monthly_high_drop",
-                        message=self._format_message(
-                            stock_data.ticker,
-                            stock_data.current_price,
-                            historical_data.monthly_high,
-                            drop_pct,
-                            threshold,
-                        ),
-                        severity=severity,
-                        current_price=stock_data.current_price,
-                        triggered_at=datetime.now(),
-                        metadata={
-                            "threshold": threshold,
-                            "monthly_high": historical_data.monthly_high,
-                            "drop_pct": drop_pct,
-                        },
-                    )
+        fired = self.thresholds[:triggered]
+        if self._positions is not None:
+            fired = [self._given[p] for p in sorted(self._positions[:triggered])]
+
+        for threshold in fired:
+            severity = self._get_severity(threshold)
+            metadata = base_metadata.copy()
+            metadata["threshold"] = threshold
+            append(
+                Alert(
+                    ticker=stock_data.ticker,
+                    rule_type="monthly_high_drop",
+                    message=self._format_message(
+                        stock_data.ticker,
+                        stock_data.current_price,
+                        historical_data.monthly_high,
+                        drop_pct,
+                        threshold,
+                    ),
+                    severity=severity,
+                    current_price=stock_data.current_price,
+                    triggered_at=now,
+                    metadata=metadata,
                 )
+            )
 
         return alerts
 
+    def evaluate_batch(self, batch: "MarketBatch") -> "np.ndarray":
+        if self._ratio_limit is None:
+            return batch.mask(False)
+        high = batch.monthly_high
+        return batch.has_history & (
+            (high <= 0) | (batch.current_price <= high * self._ratio_limit)
+        )
+
     def _get_severity(self, threshold: float) -> AlertSeverity:
         """Determine severity based on threshold."""
-        if threshold <= -15:
-            return AlertSeverity.CRITICAL
-        elif threshold <= -10:
-            return AlertSeverity.WARNING
-        else:
-            return AlertSeverity.INFO
+        for bound, severity in _DROP_SEVERITY_BANDS:
+            if threshold <= bound:
+                return severity
+        return _SEV_INFO
 
     def _format_message(
         self,
@@ -134,6 +243,8 @@ class MonthlyHighDropRule(Rule):
 class MonthlyLowRiseRule(Rule):
     """Rule for detecting rises from monthly low."""
 
+    __slots__ = ("thresholds",)
+
     def __init__(self, thresholds: list[float]):
         """
         Initialize monthly low rise rule.
@@ -147,17 +258,28 @@ class MonthlyLowRiseRule(Rule):
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         if historical_data is None:
             return []
 
         rise_pct = historical_data.rise_from_low(stock_data.current_price)
         alerts = []
+        append = alerts.append
+        if now is None:
+            now = datetime.now()
+        base_metadata = {
+            "threshold": None,
+            "monthly_low": historical_data.monthly_low,
+            "rise_pct": rise_pct,
+        }
 
         for threshold in self.thresholds:
             if rise_pct >= threshold:
                 severity = self._get_severity(threshold)
-                alerts.append(
+                metadata = base_metadata.copy()
+                metadata["threshold"] = threshold
+                append(
                     Alert(
                         ticker=stock_data.ticker,
                         rule_type="monthly_low_rise",
@@ -170,25 +292,24 @@ class MonthlyLowRiseRule(Rule):
                         ),
                         severity=severity,
                         current_price=stock_data.current_price,
-                        triggered_at=datetime.now(),
-                        metadata={
-                            "threshold": threshold,
-                            "monthly_low": historical_data.monthly_low,
-                            "rise_pct": rise_pct,
-                        },
+                        triggered_at=now,
+                        metadata=metadata,
                     )
                 )
 
         return alerts
 
+    def evaluate_batch(self, batch: "MarketBatch") -> "np.ndarray":
+        if not self.thresholds:
+            return batch.mask(False)
+        return batch.has_history & (batch.rise_from_low() >= self.thresholds[0])
+
     def _get_severity(self, threshold: float) -> AlertSeverity:
         """Determine severity based on threshold."""
-        if threshold >= 10:
-            return AlertSeverity.CRITICAL
-        elif threshold >= 7:
-            return AlertSeverity.WARNING
-        else:
-            return AlertSeverity.INFO
+        for bound, severity in _RISE_SEVERITY_BANDS:
+            if threshold >= bound:
+                return severity
+        return _SEV_INFO
 
     def _format_message(
         self,
@@ -209,6 +330,8 @@ class MonthlyLowRiseRule(Rule):
 class PriceTargetRule(Rule):
     """Rule for detecting price changes relative to a fixed reference price."""
 
+    __slots__ = ("reference_price", "thresholds")
+
     def __init__(self, reference_price: float, thresholds: list[float]):
         """
         Initialize price target rule.
@@ -224,15 +347,26 @@ class PriceTargetRule(Rule):
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         change_pct = ((stock_data.current_price - self.reference_price) / self.reference_price) * 100
         alerts = []
+        append = alerts.append
+        if now is None:
+            now = datetime.now()
+        base_metadata = {
+            "threshold": None,
+            "reference_price": self.reference_price,
+            "change_pct": change_pct,
+        }
 
         for threshold in self.thresholds:
             triggered = (threshold > 0 and change_pct >= threshold) or (threshold < 0 and change_pct <= threshold)
             if triggered:
                 severity = self._get_severity(threshold)
-                alerts.append(
+                metadata = base_metadata.copy()
+                metadata["threshold"] = threshold
+                append(
                     Alert(
                         ticker=stock_data.ticker,
                         rule_type="price_target",
@@ -244,12 +378,8 @@ class PriceTargetRule(Rule):
                         ),
                         severity=severity,
                         current_price=stock_data.current_price,
-                        triggered_at=datetime.now(),
-                        metadata={
-                            "threshold": threshold,
-                            "reference_price": self.reference_price,
-                            "change_pct": change_pct,
-                        },
+                        triggered_at=now,
+                        metadata=metadata,
                     )
                 )
 
@@ -258,12 +388,10 @@ class PriceTargetRule(Rule):
     def _get_severity(self, threshold: float) -> AlertSeverity:
         """Determine severity based on threshold magnitude."""
         abs_threshold = abs(threshold)
-        if abs_threshold >= 10:
-            return AlertSeverity.CRITICAL
-        elif abs_threshold >= 5:
-            return AlertSeverity.WARNING
-        else:
-            return AlertSeverity.INFO
+        for bound, severity in _TARGET_SEVERITY_BANDS:
+            if abs_threshold >= bound:
+                return severity
+        return _SEV_INFO
 
     def _format_message(
         self,
@@ -282,9 +410,20 @@ class PriceTargetRule(Rule):
         )
 
 
+# Trigger checks per DailyChangeRule direction; each works on a scalar
+# percentage or on a NumPy array of them
+_DAILY_CHANGE_CHECKS: dict[str, Callable[[Any, float], Any]] = {
+    "both": lambda change_pct, threshold: abs(change_pct) >= threshold,
+    "up": lambda change_pct, threshold: change_pct >= threshold,
+    "down": lambda change_pct, threshold: change_pct <= -threshold,
+}
+
+
 class DailyChangeRule(Rule):
     """Rule for detecting significant daily price changes."""
 
+    __slots__ = ("threshold", "direction", "_check")
+
     def __init__(self, threshold: float, direction: str = "both"):
         """
         Initialize daily change rule.
@@ -295,24 +434,18 @@ class DailyChangeRule(Rule):
         """
         self.threshold = threshold
         self.direction = direction
+        # Resolve the direction once; unknown directions never trigger
+        self._check = _DAILY_CHANGE_CHECKS.get(direction)
 
     def evaluate(
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         change_pct = stock_data.daily_change_pct
 
-        # Check if change meets threshold based on direction
-        should_alert = False
-        if self.direction == "both" and abs(change_pct) >= self.threshold:
-            should_alert = True
-        elif self.direction == "up" and change_pct >= self.threshold:
-            should_alert = True
-        elif self.direction == "down" and change_pct <= -self.threshold:
-            should_alert = True
-
-        if not should_alert:
+        if self._check is None or not self._check(change_pct, self.threshold):
             return []
 
         is_surge = change_pct > 0
@@ -331,7 +464,7 @@ class DailyChangeRule(Rule):
                 ),
                 severity=severity,
                 current_price=stock_data.current_price,
-                triggered_at=datetime.now(),
+                triggered_at=now or datetime.now(),
                 metadata={
                     "change_pct": change_pct,
                     "threshold": self.threshold,
@@ -340,14 +473,17 @@ class DailyChangeRule(Rule):
             )
         ]
 
+    def evaluate_batch(self, batch: "MarketBatch") -> "np.ndarray":
+        if self._check is None:
+            return batch.mask(False)
+        return self._check(batch.daily_change_pct, self.threshold)
+
     def _get_severity(self, change_pct: float) -> AlertSeverity:
         """Determine severity based on change magnitude."""
-        if change_pct >= 10:
-            return AlertSeverity.CRITICAL
-        elif change_pct >= 7:
-            return AlertSeverity.WARNING
-        else:
-            return AlertSeverity.INFO
+        for bound, severity in _RISE_SEVERITY_BANDS:
+            if change_pct >= bound:
+                return severity
+        return _SEV_INFO
 
     def _format_message(
         self,
@@ -369,6 +505,8 @@ class DailyChangeRule(Rule):
 class VolumeSpikeRule(Rule):
     """Rule for detecting volume spikes."""
 
+    __slots__ = ("multiplier", "average_days")
+
     def __init__(self, multiplier: float = 3.0, average_days: int = 20):
         """
         Initialize volume spike rule.
@@ -384,6 +522,7 @@ class VolumeSpikeRule(Rule):
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
         if historical_data is None:
             return []
@@ -407,7 +546,7 @@ class VolumeSpikeRule(Rule):
                 ),
                 severity=severity,
                 current_price=stock_data.current_price,
-                triggered_at=datetime.now(),
+                triggered_at=now or datetime.now(),
                 metadata={
                     "volume_ratio": volume_ratio,
                     "current_volume": stock_data.volume,
@@ -416,12 +555,15 @@ class VolumeSpikeRule(Rule):
             )
         ]
 
+    def evaluate_batch(self, batch: "MarketBatch") -> "np.ndarray":
+        return batch.has_history & (batch.volume_ratio() >= self.multiplier)
+
     def _get_severity(self, volume_ratio: float) -> AlertSeverity:
         """Determine severity based on volume ratio."""
-        if volume_ratio >= 5:
-            return AlertSeverity.WARNING
-        else:
-            return AlertSeverity.INFO
+        for bound, severity in _VOLUME_SEVERITY_BANDS:
+            if volume_ratio >= bound:
+                return severity
+        return _SEV_INFO
 
     def _format_message(
         self,
@@ -437,22 +579,188 @@ class VolumeSpikeRule(Rule):
         )
 
 
+# Variables available to custom conditions, in the order evaluate() fills
+# the value vector. Historical variables are None when no history exists.
+_CONDITION_VARS = (
+    "price",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "daily_change_pct",
+    "avg_volume_20",
+    "monthly_high",
+    "monthly_low",
+)
+_VAR_INDEX = {name: i for i, name in enumerate(_CONDITION_VARS)}
+_HISTORICAL_VARS = frozenset({"avg_volume_20", "monthly_high", "monthly_low"})
+
+_BIN_OPS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: safe_power,
+}
+_CMP_OPS: dict[type, Callable[[Any, Any], bool]] = {
+    ast.Lt: operator.lt,
+    ast.Gt: operator.gt,
+    ast.LtE: operator.le,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_UNARY_OPS: dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Not: operator.not_,
+}
+_FUNCTIONS: dict[str, Callable[[Any], Any]] = {"int": int, "float": float}
+
+# A compiled condition maps the value vector to the condition's result
+ConditionFn = Callable[[Sequence[Any]], Any]
+
+
+@lru_cache(maxsize=1024)
+def _compile_condition(condition: str) -> ConditionFn:
+    """
+    Compile a condition expression into a tree of closures.
+
+    Results are memoized, so rules sharing a condition share one function.
+
+    Args:
+        condition: Expression such as "price < 150 and volume > 1000000"
+
+    Returns:
+        Function taking the value vector (ordered as _CONDITION_VARS)
+
+    Raises:
+        ValueError: If the expression does not parse or uses unsupported syntax
+    """
+    try:
+        tree = ast.parse(condition.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition syntax: {condition}") from e
+
+    return _compile_node(tree.body, condition)
+
+
+def _compile_node(node: ast.expr, condition: str) -> ConditionFn:
+    """Compile one expression node; see _compile_condition."""
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float)):
+            raise ValueError(f"Invalid condition syntax: {condition}")
+        value = node.value
+        return lambda v: value
+
+    if isinstance(node, ast.Name):
+        index = _VAR_INDEX.get(node.id)
+        if index is None:
+            raise ValueError(f"Invalid condition: unknown variable '{node.id}'")
+        if node.id not in _HISTORICAL_VARS:
+            return operator.itemgetter(index)
+
+        name = node.id
+
+        def load_historical(v: Sequence[Any]) -> Any:
+            value = v[index]
+            if value is None:
+                raise NameError(f"'{name}' requires historical data")
+            return value
+
+        return load_historical
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        op = _BIN_OPS[type(node.op)]
+        left = _compile_node(node.left, condition)
+        right = _compile_node(node.right, condition)
+        return lambda v: op(left(v), right(v))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand, condition)
+        return lambda v: op(operand(v))
+
+    if isinstance(node, ast.Compare) and all(type(o) in _CMP_OPS for o in node.ops):
+        if len(node.ops) == 1:
+            op = _CMP_OPS[type(node.ops[0])]
+            left = _compile_node(node.left, condition)
+            right_node = node.comparators[0]
+            if isinstance(right_node, ast.Constant):
+                # Common case ("price < 150"): fold the constant into the closure
+                constant = _compile_node(right_node, condition)(())
+                return lambda v: op(left(v), constant)
+            right = _compile_node(right_node, condition)
+            return lambda v: op(left(v), right(v))
+
+        # Chained comparison: a < b < c means a < b and b < c
+        ops = [_CMP_OPS[type(o)] for o in node.ops]
+        operands = [_compile_node(n, condition) for n in [node.left, *node.comparators]]
+
+        def compare_chain(v: Sequence[Any]) -> bool:
+            left_value = operands[0](v)
+            for op, operand in zip(ops, operands[1:]):
+                right_value = operand(v)
+                if not op(left_value, right_value):
+                    return False
+                left_value = right_value
+            return True
+
+        return compare_chain
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile_node(n, condition) for n in node.values]
+        if isinstance(node.op, ast.And):
+            def all_of(v: Sequence[Any]) -> Any:
+                result = True
+                for value in values:
+                    result = value(v)
+                    if not result:
+                        return result
+                return result
+
+            return all_of
+
+        def any_of(v: Sequence[Any]) -> Any:
+            result = False
+            for value in values:
+                result = value(v)
+                if result:
+                    return result
+            return result
+
+        return any_of
+
+    if isinstance(node, ast.IfExp):
+        test = _compile_node(node.test, condition)
+        body = _compile_node(node.body, condition)
+        orelse = _compile_node(node.orelse, condition)
+        return lambda v: body(v) if test(v) else orelse(v)
+
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _FUNCTIONS
+        and len(node.args) == 1
+        and not node.keywords
+    ):
+        func = _FUNCTIONS[node.func.id]
+        arg = _compile_node(node.args[0], condition)
+        return lambda v: func(arg(v))
+
+    raise ValueError(f"Invalid condition syntax: {condition}")
+
+
 class CustomRule(Rule):
     """User-defined custom rule with expression evaluation."""
 
+    __slots__ = ("name", "condition", "_fn")
+
     # Allowed variable names
-    ALLOWED_VARS = {
-        "price",
-        "open",
-        "high",
-        "low",
-        "close",
-        "volume",
-        "avg_volume_20",
-        "monthly_high",
-        "monthly_low",
-        "daily_change_pct",
-    }
+    ALLOWED_VARS = set(_CONDITION_VARS)
 
     def __init__(self, name: str, condition: str):
         """
@@ -467,57 +775,38 @@ class CustomRule(Rule):
         """
         self.name = name
         self.condition = condition
-        self._validate_condition(condition)
-
-    def _validate_condition(self, condition: str) -> None:
-        """Validate condition syntax."""
-        # Check for disallowed patterns (potential exploits)
-        disallowed = ["__", "import", "exec", "eval", "open", "file"]
-        for pattern in disallowed:
-            if pattern in condition.lower():
-                raise ValueError(f"Invalid condition: contains disallowed pattern '{pattern}'")
-
-        # Check for valid characters only
-        allowed_pattern = r'^[\w\s\d\.\+\-\*\/\<\>\=\!\(\)\_]+$'
-        if not re.match(allowed_pattern, condition):
-            raise ValueError(f"Invalid condition syntax: {condition}")
-
-        # Try to evaluate with dummy values to check syntax
-        try:
-            dummy_context = {var: 0 for var in self.ALLOWED_VARS}
-            simple_eval(condition, names=dummy_context)
-        except InvalidExpression as e:
-            raise ValueError(f"Invalid condition syntax: {condition}") from e
-        except Exception:
-            # Other errors (like division by zero) are OK for syntax validation
-            pass
+        # Compiling also validates: only whitelisted variables, operators and
+        # numeric constants are accepted. evaluate() only calls the closure tree
+        self._fn = _compile_condition(condition)
 
     def evaluate(
         self,
         stock_data: StockData,
         historical_data: Optional[HistoricalData],
+        now: Optional[datetime] = None,
     ) -> list[Alert]:
-        # Build variable context
-        context = {
-            "price": stock_data.current_price,
-            "open": stock_data.open_price,
-            "high": stock_data.high,
-            "low": stock_data.low,
-            "close": stock_data.previous_close,
-            "volume": stock_data.volume,
-            "daily_change_pct": stock_data.daily_change_pct,
-        }
+        # Value vector ordered as _CONDITION_VARS
+        values = [
+            stock_data.current_price,
+            stock_data.open_price,
+            stock_data.high,
+            stock_data.low,
+            stock_data.previous_close,
+            stock_data.volume,
+            stock_data.daily_change_pct,
+        ]
 
         if historical_data:
-            context.update({
-                "avg_volume_20": historical_data.avg_volume_20d,
-                "monthly_high": historical_data.monthly_high,
-                "monthly_low": historical_data.monthly_low,
-            })
+            values += (
+                historical_data.avg_volume_20d,
+                historical_data.monthly_high,
+                historical_data.monthly_low,
+            )
+        else:
+            values += (None, None, None)
 
-        # Safely evaluate expression using simpleeval
         try:
-            result = simple_eval(self.condition, names=context)
+            result = self._fn(values)
         except Exception as e:
             logger.warning(f"Failed to evaluate custom rule '{self.name}': {e}")
             return []
@@ -530,9 +819,9 @@ class CustomRule(Rule):
                 ticker=stock_data.ticker,
                 rule_type="custom",
                 message=f"{self.name}: {stock_data.ticker} at ${stock_data.current_price:.2f}",
-                severity=AlertSeverity.INFO,
+                severity=_SEV_INFO,
                 current_price=stock_data.current_price,
-                triggered_at=datetime.now(),
+                triggered_at=now or datetime.now(),
                 metadata={
                     "rule_name": self.name,
                     "condition": self.condition,
@@ -2,8 +2,32 @@
 Pytest configuration and shared fixtures.
 """
 
+import socketserver
+import threading
+
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from src.database.connection import Database
+from src.database.repository import (
+    SymbolRepository,
+    UserRepository,
+    WatchlistRepository,
+    RuleRepository,
+    AlertHistoryRepository,
+)
+from src.database.models import Symbol, User, UserRule
+from src.notifiers.ratelimit import reset_buckets
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limit_buckets():
+    """Give each test fresh per-webhook rate limit buckets."""
+    reset_buckets()
+    yield
+    reset_buckets()
 
 
 @pytest.fixture
@@ -28,6 +52,81 @@ def sample_discord_webhook_url():
     return "https://discord.com/api/webhooks/123456789/abcdefghijklmnop"
 
 
+@pytest.fixture(scope="session")
+def discord_responses():
+    """Prebuilt Discord webhook responses (204, 400, 429), shared read-only."""
+    ok = Mock(status_code=204, ok=True, text="", headers={})
+    bad = Mock(status_code=400, ok=False, text="Bad Request", headers={})
+    rate = Mock(status_code=429, ok=False, text="", headers={"Retry-After": "1"})
+    return SimpleNamespace(ok=ok, bad=bad, rate=rate)
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server session that stores received messages."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self._reply("220 localhost SMTP sink")
+        mail_from, rcpt_tos = None, []
+
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from = command.partition(":")[2].strip()
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_tos.append(command.partition(":")[2].strip())
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                content = []
+                while (data_line := self.rfile.readline()) not in (b".\r\n", b""):
+                    # Undo SMTP dot-stuffing
+                    content.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                self.server.messages.append(
+                    SimpleNamespace(
+                        mail_from=mail_from, rcpt_tos=rcpt_tos, content=b"".join(content)
+                    )
+                )
+                mail_from, rcpt_tos = None, []
+                self._reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                mail_from, rcpt_tos = None, []
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+@pytest.fixture(scope="session")
+def _smtp_server():
+    """In-process SMTP server on an ephemeral localhost port."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPSinkHandler)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def smtp_sink(_smtp_server):
+    """Local SMTP sink with an empty inbox; exposes host, port and messages."""
+    _smtp_server.messages.clear()
+    host, port = _smtp_server.server_address
+    return SimpleNamespace(host=host, port=port, messages=_smtp_server.messages)
+
+
 @pytest.fixture
 def sample_smtp_config():
     """Sample SMTP configuration for testing."""
@@ -39,3 +138,67 @@ def sample_smtp_config():
         "from_address": "alerts@modo.app",
         "to_addresses": ["recipient@example.com"],
     }
+
+
+@pytest.fixture
+def db():
+    """Create in-memory database with schema."""
+    db = Database(":memory:")
+    db.initialize()
+    return db
+
+
+@pytest.fixture
+def repos(db):
+    """Create all repositories."""
+    return {
+        "symbol": SymbolRepository(db),
+        "user": UserRepository(db),
+        "watchlist": WatchlistRepository(db),
+        "rule": RuleRepository(db),
+        "alert": AlertHistoryRepository(db),
+    }
+
+
+@pytest.fixture
+def setup_data(repos):
+    """Set up test data."""
+    # Create symbols
+    aapl = repos["symbol"].create(
+        Symbol(ticker="AAPL", name="Apple Inc.", type="stock", exchange="NASDAQ")
+    )
+    googl = repos["symbol"].create(
+        Symbol(ticker="GOOGL", name="Alphabet Inc.", type="stock", exchange="NASDAQ")
+    )
+
+    # Create user
+    user = repos["user"].create(
+        User(
+            email="test@example.com",
+            discord_webhook_url="https://discord.com/api/webhooks/123/abc",
+        )
+    )
+
+    # Add to watchlist
+    repos["watchlist"].add(user.id, aapl.id)
+    repos["watchlist"].add(user.id, googl.id)
+
+    # Create rules
+    repos["rule"].create(
+        UserRule(
+            user_id=user.id,
+            rule_type="monthly_high_drop",
+            parameters={"thresholds": [-5, -10, -15]},
+            enabled=True,
+        )
+    )
+    repos["rule"].create(
+        UserRule(
+            user_id=user.id,
+            rule_type="daily_change",
+            parameters={"threshold": 5, "direction": "both"},
+            enabled=True,
+        )
+    )
+
+    return {"user": user, "symbols": {"AAPL": aapl, "GOOGL": googl}}
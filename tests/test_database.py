@@ -482,6 +482,27 @@ class TestAlertHistoryRepository:
         updated = repos["alert"].get_by_id(alert.id)
         assert updated.notified_at is not None
 
+    def test_mark_notified_at_given_time(self, repos):
+        """Should stamp notified_at with the supplied time."""
+        user = repos["user"].create(User(email="test@example.com"))
+        symbol = repos["symbol"].create(
+            Symbol(ticker="AAPL", name="Apple", type="stock", exchange="NASDAQ")
+        )
+        notified_at = datetime(2024, 1, 1, 12, 0, 0)
+        alert = repos["alert"].create(
+            AlertHistory(
+                user_id=user.id,
+                symbol_id=symbol.id,
+                rule_type="monthly_high_drop",
+                message="Test",
+                triggered_at=notified_at,
+            )
+        )
+
+        repos["alert"].mark_notified(alert.id, notified_at=notified_at)
+
+        assert repos["alert"].get_by_id(alert.id).notified_at == notified_at
+
     def test_check_recent_alert_exists(self, repos):
         """Should check if similar alert was sent recently (for deduplication)."""
         user = repos["user"].create(User(email="test@example.com"))
@@ -564,3 +585,30 @@ class TestAlertHistoryRepository:
 
         history = repos["alert"].get_user_history(user.id, limit=3)
         assert len(history) == 3
+
+    def test_get_user_alert_history_by_symbol(self, repos):
+        """Should group a user's alert history by symbol."""
+        user = repos["user"].create(User(email="test@example.com"))
+        aapl = repos["symbol"].create(
+            Symbol(ticker="AAPL", name="Apple", type="stock", exchange="NASDAQ")
+        )
+        msft = repos["symbol"].create(
+            Symbol(ticker="MSFT", name="Microsoft", type="stock", exchange="NASDAQ")
+        )
+
+        for i, symbol in enumerate([aapl, msft, aapl]):
+            repos["alert"].create(
+                AlertHistory(
+                    user_id=user.id,
+                    symbol_id=symbol.id,
+                    rule_type="monthly_high_drop",
+                    message=f"Alert {i}",
+                    triggered_at=datetime.now() - timedelta(hours=i),
+                )
+            )
+
+        history = repos["alert"].get_user_history_by_symbol(user.id)
+
+        assert set(history) == {aapl.id, msft.id}
+        assert [h.message for h in history[aapl.id]] == ["Alert 0", "Alert 2"]
+        assert [h.message for h in history[msft.id]] == ["Alert 1"]
@@ -7,88 +7,29 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 from pathlib import Path
+import io
+import json
 
 from src.database.connection import Database
 from src.database.repository import (
     SymbolRepository,
     UserRepository,
     WatchlistRepository,
-    RuleRepository,
-    AlertHistoryRepository,
 )
-from src.database.models import Symbol, User, UserRule
-from src.data.fetcher import StockDataFetcher, StockData, HistoricalData
-from src.rules.engine import RuleEngine, AlertSeverity
-from src.notifiers.discord import DiscordNotifier
-from src.app import ModoApp
+from src.database.models import Symbol, User, AlertHistory
+from src.cli import add_user, add_to_watchlist, sync_symbols, list_symbols
+
+FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0)
 
 
 class TestFullAlertFlow:
     """Test complete alert flow from data fetch to notification."""
 
-    @pytest.fixture
-    def db(self):
-        """Create in-memory database with schema."""
-        db = Database(":memory:")
-        db.initialize()
-        return db
-
-    @pytest.fixture
-    def repos(self, db):
-        """Create all repositories."""
-        return {
-            "symbol": SymbolRepository(db),
-            "user": UserRepository(db),
-            "watchlist": WatchlistRepository(db),
-            "rule": RuleRepository(db),
-            "alert": AlertHistoryRepository(db),
-        }
-
-    @pytest.fixture
-    def setup_data(self, repos):
-        """Set up test data."""
-        # Create symbols
-        aapl = repos["symbol"].create(
-            Symbol(ticker="AAPL", name="Apple Inc.", type="stock", exchange="NASDAQ")
-        )
-        googl = repos["symbol"].create(
-            Symbol(ticker="GOOGL", name="Alphabet Inc.", type="stock", exchange="NASDAQ")
-        )
-
-        # Create user
-        user = repos["user"].create(
-            User(
-                email="test@example.com",
-                discord_webhook_url="https://discord.com/api/webhooks/123/abc",
-            )
-        )
-
-        # Add to watchlist
-        repos["watchlist"].add(user.id, aapl.id)
-        repos["watchlist"].add(user.id, googl.id)
-
-        # Create rules
-        repos["rule"].create(
-            UserRule(
-                user_id=user.id,
-                rule_type="monthly_high_drop",
-                parameters={"thresholds": [-5, -10, -15]},
-                enabled=True,
-            )
-        )
-        repos["rule"].create(
-            UserRule(
-                user_id=user.id,
-                rule_type="daily_change",
-                parameters={"threshold": 5, "direction": "both"},
-                enabled=True,
-            )
-        )
-
-        return {"user": user, "symbols": {"AAPL": aapl, "GOOGL": googl}}
-
-    def test_alert_triggered_and_sent(self, db, repos, setup_data):
+    def test_alert_triggered_and_sent(self, db, repos, setup_data, discord_responses):
         """Should trigger and send alert for qualifying condition."""
+        from src.app import ModoApp
+        from src.data.fetcher import StockData, HistoricalData
+
         # Mock stock data showing 10% drop from monthly high
         mock_current_data = {
             "AAPL": StockData(
@@ -99,7 +40,7 @@ class TestFullAlertFlow:
                 high=171.00,
                 low=164.00,
                 volume=50_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
             "GOOGL": StockData(
                 ticker="GOOGL",
@@ -109,7 +50,7 @@ class TestFullAlertFlow:
                 high=141.00,
                 low=138.50,
                 volume=20_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
         }
 
@@ -132,34 +73,40 @@ class TestFullAlertFlow:
             ),
         }
 
-        with patch.object(StockDataFetcher, "get_current_data") as mock_current, \
-             patch.object(StockDataFetcher, "get_historical_data") as mock_historical, \
-             patch("requests.post") as mock_discord:
+        app = ModoApp(db, now=lambda: FIXED_NOW)
+        app.fetcher.get_current_data = mock_current_data.__getitem__
+        app.fetcher.get_historical_data = mock_historical_data.__getitem__
 
-            mock_current.side_effect = lambda ticker: mock_current_data[ticker]
-            mock_historical.side_effect = lambda ticker, **kwargs: mock_historical_data[ticker]
-            mock_discord.return_value.status_code = 204
-            mock_discord.return_value.ok = True
+        with patch("src.notifiers.discord.DiscordNotifier._session.post") as mock_discord:
+            mock_discord.return_value = discord_responses.ok
 
-            # Run the app
-            app = ModoApp(db)
             app.run_check()
 
         # Verify Discord was called for AAPL alert
         assert mock_discord.called
         call_args = mock_discord.call_args
-        payload = call_args[1]["json"]
+        payload = json.loads(call_args.kwargs["data"])
 
         # Should have embed with AAPL
-        assert any("AAPL" in str(embed) for embed in payload.get("embeds", []))
+        assert any(
+            "AAPL" in embed.get("title", "") or "AAPL" in embed.get("description", "")
+            for embed in payload.get("embeds", [])
+        )
 
         # Verify alert history was saved
-        history = repos["alert"].get_user_history(setup_data["user"].id)
-        assert len(history) >= 1
-        assert any(h.symbol_id == setup_data["symbols"]["AAPL"].id for h in history)
+        history = repos["alert"].get_user_history_by_symbol(setup_data["user"].id)
+        assert len(history[setup_data["symbols"]["AAPL"].id]) >= 1
+        # Cooldown bookkeeping uses the injected clock, not wall time
+        assert all(
+            record.notified_at == FIXED_NOW
+            for record in history[setup_data["symbols"]["AAPL"].id]
+        )
 
-    def test_no_duplicate_alerts_within_cooldown(self, db, repos, setup_data):
+    def test_no_duplicate_alerts_within_cooldown(self, db, repos, setup_data, discord_responses):
         """Should not send duplicate alerts within cooldown period."""
+        from src.app import ModoApp
+        from src.data.fetcher import StockData, HistoricalData
+
         # Create existing alert from 1 hour ago
         repos["alert"].create(
             AlertHistory(
@@ -167,8 +114,8 @@ class TestFullAlertFlow:
                 symbol_id=setup_data["symbols"]["AAPL"].id,
                 rule_type="monthly_high_drop",
                 message="Previous alert",
-                triggered_at=datetime.now() - timedelta(hours=1),
-                notified_at=datetime.now() - timedelta(hours=1),
+                triggered_at=FIXED_NOW - timedelta(hours=1),
+                notified_at=FIXED_NOW - timedelta(hours=1),
             )
         )
 
@@ -181,7 +128,7 @@ class TestFullAlertFlow:
                 high=171.00,
                 low=164.00,
                 volume=50_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
             "GOOGL": StockData(
                 ticker="GOOGL",
@@ -191,7 +138,7 @@ class TestFullAlertFlow:
                 high=141.00,
                 low=138.50,
                 volume=20_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
         }
 
@@ -214,28 +161,31 @@ class TestFullAlertFlow:
             ),
         }
 
-        with patch.object(StockDataFetcher, "get_current_data") as mock_current, \
-             patch.object(StockDataFetcher, "get_historical_data") as mock_historical, \
-             patch("requests.post") as mock_discord:
+        app = ModoApp(db, alert_cooldown_hours=24, now=lambda: FIXED_NOW)
+        app.fetcher.get_current_data = mock_current_data.__getitem__
+        app.fetcher.get_historical_data = mock_historical_data.__getitem__
 
-            mock_current.side_effect = lambda ticker: mock_current_data[ticker]
-            mock_historical.side_effect = lambda ticker, **kwargs: mock_historical_data[ticker]
-            mock_discord.return_value.status_code = 204
-            mock_discord.return_value.ok = True
+        with patch("src.notifiers.discord.DiscordNotifier._session.post") as mock_discord:
+            mock_discord.return_value = discord_responses.ok
 
-            app = ModoApp(db, alert_cooldown_hours=24)
             app.run_check()
 
         # Discord should NOT be called due to cooldown
         # (AAPL already alerted within 24 hours)
         aapl_alerts = [
             call for call in mock_discord.call_args_list
-            if "AAPL" in str(call)
+            if any(
+                "AAPL" in embed.get("title", "")
+                for embed in json.loads(call.kwargs["data"]).get("embeds", [])
+            )
         ]
         assert len(aapl_alerts) == 0
 
-    def test_multiple_rules_same_symbol(self, db, repos, setup_data):
+    def test_multiple_rules_same_symbol(self, db, repos, setup_data, discord_responses):
         """Should trigger multiple rule types for same symbol."""
+        from src.app import ModoApp
+        from src.data.fetcher import StockData, HistoricalData
+
         mock_current_data = {
             "AAPL": StockData(
                 ticker="AAPL",
@@ -245,7 +195,7 @@ class TestFullAlertFlow:
                 high=166.00,
                 low=155.00,
                 volume=50_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
             "GOOGL": StockData(
                 ticker="GOOGL",
@@ -255,7 +205,7 @@ class TestFullAlertFlow:
                 high=141.00,
                 low=138.50,
                 volume=20_000_000,
-                timestamp=datetime.now(),
+                timestamp=FIXED_NOW,
             ),
         }
 
@@ -278,28 +228,79 @@ class TestFullAlertFlow:
             ),
         }
 
-        with patch.object(StockDataFetcher, "get_current_data") as mock_current, \
-             patch.object(StockDataFetcher, "get_historical_data") as mock_historical, \
-             patch("requests.post") as mock_discord:
+        app = ModoApp(db, now=lambda: FIXED_NOW)
+        app.fetcher.get_current_data = mock_current_data.__getitem__
+        app.fetcher.get_historical_data = mock_historical_data.__getitem__
 
-            mock_current.side_effect = lambda ticker: mock_current_data[ticker]
-            mock_historical.side_effect = lambda ticker, **kwargs: mock_historical_data[ticker]
-            mock_discord.return_value.status_code = 204
-            mock_discord.return_value.ok = True
+        with patch("src.notifiers.discord.DiscordNotifier._session.post") as mock_discord:
+            mock_discord.return_value = discord_responses.ok
 
-            app = ModoApp(db)
             app.run_check()
 
         # Should have alerts for both monthly_high_drop AND daily_change for AAPL
-        history = repos["alert"].get_user_history(setup_data["user"].id)
-        aapl_alerts = [
-            h for h in history
-            if h.symbol_id == setup_data["symbols"]["AAPL"].id
-        ]
+        history = repos["alert"].get_user_history_by_symbol(setup_data["user"].id)
+        aapl_alerts = history[setup_data["symbols"]["AAPL"].id]
         rule_types = {h.rule_type for h in aapl_alerts}
 
         assert "monthly_high_drop" in rule_types
         assert "daily_change" in rule_types
+        # Both alerts went out in one webhook message
+        aapl_posts = [
+            json.loads(call.kwargs["data"])["embeds"]
+            for call in mock_discord.call_args_list
+            if "AAPL" in call.kwargs["data"].decode()
+        ]
+        assert len(aapl_posts) == 1
+        assert len(aapl_posts[0]) == 2
+
+    def test_retry_budget_bounds_discord_outage(self, db, repos, setup_data):
+        """Should stop retrying once the run's retry budget is spent."""
+        import requests
+        from src.app import ModoApp
+        from src.data.fetcher import StockData, HistoricalData
+
+        mock_current_data = {
+            ticker: StockData(
+                ticker=ticker,
+                current_price=165.00,
+                previous_close=166.00,
+                open_price=166.00,
+                high=167.00,
+                low=164.00,
+                volume=20_000_000,
+                timestamp=FIXED_NOW,
+            )
+            for ticker in ("AAPL", "GOOGL")
+        }
+        mock_historical_data = {
+            ticker: HistoricalData(
+                ticker=ticker,
+                monthly_high=185.00,  # -10.8% drop from high
+                monthly_low=160.00,
+                avg_volume_20d=45_000_000,
+                prices=[],
+                volumes=[],
+            )
+            for ticker in ("AAPL", "GOOGL")
+        }
+
+        app = ModoApp(db, now=lambda: FIXED_NOW, retry_budget_seconds=0)
+        app.fetcher.get_current_data = mock_current_data.__getitem__
+        app.fetcher.get_historical_data = mock_historical_data.__getitem__
+
+        with patch("src.notifiers.discord.DiscordNotifier._session.post") as mock_discord, \
+             patch("time.sleep") as mock_sleep:
+            mock_discord.side_effect = requests.exceptions.ConnectionError("down")
+
+            app.run_check()
+
+        # Every symbol was still checked, each alert tried once, none retried
+        history = repos["alert"].get_user_history_by_symbol(setup_data["user"].id)
+        records = [record for records in history.values() for record in records]
+        assert set(history) == {symbol.id for symbol in setup_data["symbols"].values()}
+        assert mock_discord.call_count == len(records)
+        mock_sleep.assert_not_called()
+        assert all(record.notified_at is None for record in records)
 
 
 class TestCLICommands:
@@ -315,8 +316,6 @@ class TestCLICommands:
 
     def test_add_user_command(self, db):
         """Should add user via CLI."""
-        from src.cli import add_user
-
         result = add_user(
             db,
             email="test@example.com",
@@ -330,8 +329,6 @@ class TestCLICommands:
 
     def test_add_to_watchlist_command(self, db):
         """Should add symbols to watchlist via CLI."""
-        from src.cli import add_to_watchlist
-
         # Setup
         symbol_repo = SymbolRepository(db)
         user_repo = UserRepository(db)
@@ -351,18 +348,21 @@ class TestCLICommands:
         assert len(watchlist) == 1
         assert watchlist[0].ticker == "AAPL"
 
-    def test_sync_symbols_command(self, db):
+    def test_sync_symbols_command(self, db, monkeypatch):
         """Should sync symbols from API."""
-        from src.cli import sync_symbols
+        from src.data.symbols import SymbolSyncer
+
+        class FakeSyncer(SymbolSyncer):
+            def fetch_all_symbols(self) -> list[Symbol]:
+                return [
+                    Symbol(ticker="AAPL", name="Apple Inc.", type="stock", exchange="NASDAQ"),
+                    Symbol(ticker="MSFT", name="Microsoft", type="stock", exchange="NASDAQ"),
+                    Symbol(ticker="SPY", name="SPDR S&P 500", type="etf", exchange="NYSE"),
+                ]
 
-        with patch("src.data.symbols.SymbolSyncer.fetch_all_symbols") as mock_fetch:
-            mock_fetch.return_value = [
-                Symbol(ticker="AAPL", name="Apple Inc.", type="stock", exchange="NASDAQ"),
-                Symbol(ticker="MSFT", name="Microsoft", type="stock", exchange="NASDAQ"),
-                Symbol(ticker="SPY", name="SPDR S&P 500", type="etf", exchange="NYSE"),
-            ]
+        monkeypatch.setattr("src.data.symbols.SymbolSyncer", FakeSyncer)
 
-            result = sync_symbols(db)
+        result = sync_symbols(db)
 
         assert result["synced"] == 3
 
@@ -372,8 +372,6 @@ class TestCLICommands:
 
     def test_list_symbols_command(self, db):
         """Should list and search symbols."""
-        from src.cli import list_symbols
-
         symbol_repo = SymbolRepository(db)
         symbol_repo.create(
             Symbol(ticker="AAPL", name="Apple Inc.", type="stock", exchange="NASDAQ")
@@ -395,7 +393,7 @@ class TestCLICommands:
 class TestConfigValidation:
     """Test configuration loading and validation."""
 
-    def test_load_valid_config(self, tmp_path):
+    def test_load_valid_config(self):
         """Should load valid configuration."""
         from src.config import load_config
 
@@ -411,15 +409,12 @@ schedule:
   alert_check:
     frequency: hourly
 """
-        config_file = tmp_path / "config.yaml"
-        config_file.write_text(config_content)
-
-        config = load_config(str(config_file))
+        config = load_config(io.StringIO(config_content))
 
         assert config.database.path == "data/modo.db"
         assert config.schedule.timezone == "America/New_York"
 
-    def test_load_config_with_env_vars(self, tmp_path, monkeypatch):
+    def test_load_config_with_env_vars(self, monkeypatch):
         """Should substitute environment variables."""
         from src.config import load_config
 
@@ -437,14 +432,26 @@ schedule:
   alert_check:
     frequency: hourly
 """
+        config = load_config(io.StringIO(config_content))
+
+        assert config.database.path == "/custom/path/modo.db"
+
+    def test_reloaded_config_resubstitutes_env_vars(self, tmp_path, monkeypatch):
+        """Should apply current env vars when the same file is loaded again."""
+        from src.config import load_config
+
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(config_content)
+        config_file.write_text("database:\n  path: ${DB_PATH}\n")
 
-        config = load_config(str(config_file))
+        monkeypatch.setenv("DB_PATH", "/first/modo.db")
+        first = load_config(str(config_file))
+        monkeypatch.setenv("DB_PATH", "/second/modo.db")
+        second = load_config(str(config_file))
 
-        assert config.database.path == "/custom/path/modo.db"
+        assert first.database.path == "/first/modo.db"
+        assert second.database.path == "/second/modo.db"
 
-    def test_invalid_config_raises_error(self, tmp_path):
+    def test_invalid_config_raises_error(self):
         """Should raise error for invalid configuration."""
         from src.config import load_config, ConfigValidationError
 
@@ -455,11 +462,8 @@ database:
 schedule:
   timezone: "Invalid/Timezone"
 """
-        config_file = tmp_path / "config.yaml"
-        config_file.write_text(config_content)
-
         with pytest.raises(ConfigValidationError):
-            load_config(str(config_file))
+            load_config(io.StringIO(config_content))
 
 
 class TestDatabaseMigration:
@@ -497,6 +501,3 @@ class TestDatabaseMigration:
 
         assert "symbols" in tables
 
-
-# Import AlertHistory for tests
-from src.database.models import AlertHistory
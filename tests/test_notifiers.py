@@ -5,13 +5,20 @@ Tests for Discord and Email notification delivery.
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import smtplib
+
+import requests
 
 from src.notifiers.base import Notifier, NotificationResult
 from src.notifiers.discord import DiscordNotifier
 from src.notifiers.email import EmailNotifier
 from src.rules.engine import Alert, AlertSeverity
+from src.rules.types import MonthlyHighDropRule
+from src.data.fetcher import StockData, HistoricalData
+
+_FROZEN_NOW = datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
 
 
 class TestNotificationResult:
@@ -54,15 +61,14 @@ class TestDiscordNotifier:
             message="AAPL dropped 10% from monthly high. Current: $165.00, High: $183.33",
             severity=AlertSeverity.WARNING,
             current_price=165.00,
-            triggered_at=datetime.now(),
+            triggered_at=_FROZEN_NOW,
             metadata={"threshold": -10, "monthly_high": 183.33},
         )
 
-    def test_send_notification_success(self, notifier: DiscordNotifier, sample_alert):
+    def test_send_notification_success(self, notifier: DiscordNotifier, sample_alert, discord_responses):
         """Should send notification successfully."""
-        with patch("requests.post") as mock_post:
-            mock_post.return_value.status_code = 204
-            mock_post.return_value.ok = True
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
 
             result = notifier.send(sample_alert)
 
@@ -70,12 +76,10 @@ class TestDiscordNotifier:
         assert result.channel == "discord"
         mock_post.assert_called_once()
 
-    def test_send_notification_failure(self, notifier: DiscordNotifier, sample_alert):
+    def test_send_notification_failure(self, notifier: DiscordNotifier, sample_alert, discord_responses):
         """Should handle notification failure."""
-        with patch("requests.post") as mock_post:
-            mock_post.return_value.status_code = 400
-            mock_post.return_value.ok = False
-            mock_post.return_value.text = "Bad Request"
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.bad
 
             result = notifier.send(sample_alert)
 
@@ -86,10 +90,21 @@ class TestDiscordNotifier:
         """Should format embed with correct color for warning."""
         embed = notifier._create_embed(sample_alert)
 
-        assert embed["title"] is not None
-        assert "AAPL" in embed["title"]
-        assert embed["color"] == 0xFFA500  # Orange for warning
-        assert len(embed["fields"]) > 0
+        assert embed.title is not None
+        assert "AAPL" in embed.title
+        assert embed.color == 0xFFA500  # Orange for warning
+        assert len(embed.fields) > 0
+        assert embed.timestamp == "2024-01-15T12:00:00+00:00"
+
+    def test_payload_omits_unset_content(self, notifier: DiscordNotifier, sample_alert):
+        """Should serialize typed payloads to the webhook JSON shape."""
+        data = notifier._create_payload(sample_alert).to_dict()
+
+        assert "content" not in data
+        assert data["embeds"][0]["title"] == "⚠️ AAPL Alert"
+        assert data["embeds"][0]["fields"][0] == {
+            "name": "Current Price", "value": "$165.00", "inline": True,
+        }
 
     def test_format_embed_for_critical(self, notifier: DiscordNotifier):
         """Should format embed with red color for critical."""
@@ -99,12 +114,12 @@ class TestDiscordNotifier:
             message="AAPL dropped 20% from monthly high",
             severity=AlertSeverity.CRITICAL,
             current_price=150.00,
-            triggered_at=datetime.now(),
+            triggered_at=_FROZEN_NOW,
             metadata={"threshold": -20},
         )
         embed = notifier._create_embed(alert)
 
-        assert embed["color"] == 0xFF0000  # Red for critical
+        assert embed.color == 0xFF0000  # Red for critical
 
     def test_format_embed_for_info(self, notifier: DiscordNotifier):
         """Should format embed with blue color for info."""
@@ -114,12 +129,95 @@ class TestDiscordNotifier:
             message="NVDA volume spike detected",
             severity=AlertSeverity.INFO,
             current_price=480.00,
-            triggered_at=datetime.now(),
+            triggered_at=_FROZEN_NOW,
             metadata={},
         )
         embed = notifier._create_embed(alert)
 
-        assert embed["color"] == 0x3498DB  # Blue for info
+        assert embed.color == 0x3498DB  # Blue for info
+
+    def test_dedupe_suppresses_identical_alert_within_window(
+        self, notifier: DiscordNotifier, sample_alert, discord_responses
+    ):
+        """Should skip re-sending an identical alert inside the dedupe window."""
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
+
+            first = notifier.send(sample_alert)
+            second = notifier.send(sample_alert)
+            batch = notifier.send_batch([sample_alert, sample_alert])
+
+        assert mock_post.call_count == 1
+        assert first.suppressed is False
+        assert second.success is True
+        assert second.suppressed is True
+        assert all(r.suppressed for r in batch)
+
+    def test_dedupe_keeps_thresholds_in_same_band(
+        self, notifier: DiscordNotifier, discord_responses
+    ):
+        """Should send both alerts when two thresholds share a severity band."""
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=165.00,
+            previous_close=170.00,
+            open_price=169.00,
+            high=171.00,
+            low=164.00,
+            volume=50_000_000,
+            timestamp=_FROZEN_NOW,
+        )
+        historical_data = HistoricalData(
+            ticker="AAPL",
+            monthly_high=180.00,  # -8.3% drop
+            monthly_low=160.00,
+            avg_volume_20d=45_000_000,
+            prices=[],
+            volumes=[],
+        )
+        alerts = MonthlyHighDropRule(thresholds=[-5, -7]).evaluate(
+            stock_data, historical_data, _FROZEN_NOW
+        )
+        assert [a.severity for a in alerts] == [AlertSeverity.INFO, AlertSeverity.INFO]
+
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
+
+            results = notifier.send_batch(alerts)
+
+        assert [r.delivered for r in results] == [True, True]
+        payload = json.loads(mock_post.call_args.kwargs["data"])
+        assert len(payload["embeds"]) == 2
+
+    def test_suppressed_result_is_not_delivered(self):
+        """Should not count a suppressed duplicate as a delivery."""
+        result = NotificationResult(success=True, channel="discord", suppressed=True)
+
+        assert result.delivered is False
+
+    def test_dedupe_does_not_suppress_after_failure(
+        self, notifier: DiscordNotifier, sample_alert, discord_responses
+    ):
+        """Should still send an alert whose previous attempt failed."""
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.side_effect = [discord_responses.bad, discord_responses.ok]
+
+            notifier.send(sample_alert)
+            result = notifier.send(sample_alert)
+
+        assert mock_post.call_count == 2
+        assert result.success is True
+        assert result.suppressed is False
+
+    def test_chart_url_is_cached(self):
+        """Should build each ticker's chart URL only once."""
+        DiscordNotifier._chart_url.cache_clear()
+
+        first = DiscordNotifier._chart_url("AAPL")
+        second = DiscordNotifier._chart_url("AAPL")
+
+        assert first == second == "https://www.tradingview.com/symbols/AAPL"
+        assert DiscordNotifier._chart_url.cache_info().hits == 1
 
     def test_include_chart_link(self, notifier: DiscordNotifier, sample_alert):
         """Should include TradingView chart link when enabled."""
@@ -127,9 +225,9 @@ class TestDiscordNotifier:
 
         # Check that chart link is in fields or description
         has_chart_link = any(
-            "tradingview" in str(field.get("value", "")).lower()
-            for field in embed.get("fields", [])
-        ) or "tradingview" in embed.get("description", "").lower()
+            "tradingview" in field.value.lower()
+            for field in embed.fields
+        ) or "tradingview" in embed.description.lower()
 
         assert has_chart_link is True
 
@@ -141,21 +239,21 @@ class TestDiscordNotifier:
             message="Critical drop",
             severity=AlertSeverity.CRITICAL,
             current_price=150.00,
-            triggered_at=datetime.now(),
+            triggered_at=_FROZEN_NOW,
             metadata={},
         )
 
         payload = notifier._create_payload(alert)
 
-        assert "@here" in payload.get("content", "")
+        assert "@here" in (payload.content or "")
 
     def test_no_mention_on_non_critical(self, notifier: DiscordNotifier, sample_alert):
         """Should not include mention for non-critical alerts."""
         payload = notifier._create_payload(sample_alert)
 
-        assert "@here" not in payload.get("content", "")
+        assert "@here" not in (payload.content or "")
 
-    def test_send_multiple_alerts(self, notifier: DiscordNotifier):
+    def test_send_multiple_alerts(self, notifier: DiscordNotifier, discord_responses):
         """Should send multiple alerts."""
         alerts = [
             Alert(
@@ -164,7 +262,7 @@ class TestDiscordNotifier:
                 message="Alert 1",
                 severity=AlertSeverity.WARNING,
                 current_price=165.00,
-                triggered_at=datetime.now(),
+                triggered_at=_FROZEN_NOW,
                 metadata={},
             ),
             Alert(
@@ -173,34 +271,194 @@ class TestDiscordNotifier:
                 message="Alert 2",
                 severity=AlertSeverity.INFO,
                 current_price=140.00,
-                triggered_at=datetime.now(),
+                triggered_at=_FROZEN_NOW,
                 metadata={},
             ),
         ]
 
-        with patch("requests.post") as mock_post:
-            mock_post.return_value.status_code = 204
-            mock_post.return_value.ok = True
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
 
             results = notifier.send_batch(alerts)
 
+        assert mock_post.call_count == 1
         assert len(results) == 2
         assert all(r.success for r in results)
 
-    def test_rate_limit_handling(self, notifier: DiscordNotifier, sample_alert):
-        """Should handle Discord rate limiting."""
-        with patch("requests.post") as mock_post:
-            # First call returns rate limit, second succeeds
-            rate_limit_response = Mock()
-            rate_limit_response.status_code = 429
-            rate_limit_response.ok = False
-            rate_limit_response.headers = {"Retry-After": "1"}
+    def test_batch_chunks_by_ten(self, notifier: DiscordNotifier, discord_responses):
+        """Should pack up to 10 embeds into each webhook message."""
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
+
+            alerts = [
+                Alert(
+                    ticker="AAPL",
+                    rule_type="daily_change",
+                    message=f"Alert {i}",
+                    severity=AlertSeverity.INFO,
+                    current_price=100.00 + i,
+                    triggered_at=_FROZEN_NOW,
+                    metadata={},
+                )
+                for i in range(25)
+            ]
+
+            results = notifier.send_batch(alerts)
+
+        assert mock_post.call_count == 3
+        embed_counts = sorted(
+            len(json.loads(call.kwargs["data"])["embeds"])
+            for call in mock_post.call_args_list
+        )
+        assert embed_counts == [5, 10, 10]
+        assert len(results) == 25
+        assert all(r.success for r in results)
+
+    def test_batch_mentions_only_critical_chunks(self, notifier: DiscordNotifier, discord_responses):
+        """Should @here only on messages containing a critical alert."""
+        alerts = [
+            Alert(
+                ticker="AAPL",
+                rule_type="daily_change",
+                message=f"Alert {i}",
+                severity=AlertSeverity.CRITICAL if i == 0 else AlertSeverity.INFO,
+                current_price=100.00 + i,
+                triggered_at=_FROZEN_NOW,
+                metadata={},
+            )
+            for i in range(4)
+        ]
 
-            success_response = Mock()
-            success_response.status_code = 204
-            success_response.ok = True
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
 
-            mock_post.side_effect = [rate_limit_response, success_response]
+            notifier.send_batch(alerts, embeds_per_message=2)
+
+        payloads = sorted(
+            (json.loads(call.kwargs["data"]) for call in mock_post.call_args_list),
+            key=lambda p: p["embeds"][0]["description"],
+        )
+        assert payloads[0].get("content") == "@here"
+        assert "content" not in payloads[1]
+
+    def test_send_batch_preserves_order(self, notifier: DiscordNotifier):
+        """Should return batch results in the same order as the alerts."""
+        alerts = [
+            Alert(
+                ticker=ticker,
+                rule_type="daily_change",
+                message=f"{ticker} alert",
+                severity=AlertSeverity.INFO,
+                current_price=100.00,
+                triggered_at=_FROZEN_NOW,
+                metadata={},
+            )
+            for ticker in ["AAPL", "GOOGL", "MSFT", "NVDA", "TSLA"]
+        ]
+
+        def respond(url, data, headers, timeout):
+            response = Mock()
+            descriptions = [e["description"] for e in json.loads(data)["embeds"]]
+            response.ok = "MSFT alert" not in descriptions
+            response.status_code = 204 if response.ok else 400
+            response.text = ""
+            response.headers = {}
+            return response
+
+        with patch.object(DiscordNotifier._session, "post", side_effect=respond):
+            results = notifier.send_batch(alerts, embeds_per_message=2)
+
+        # MSFT shares a message with NVDA, so both report the failure
+        assert [r.success for r in results] == [True, True, False, False, True]
+
+    def test_payload_is_valid_json_bytes(self, notifier: DiscordNotifier, discord_responses):
+        """Should POST the payload as pre-serialized JSON bytes."""
+        alert = Alert(
+            ticker="AAPL",
+            rule_type="monthly_high_drop",
+            message="Critical drop",
+            severity=AlertSeverity.CRITICAL,
+            current_price=150.00,
+            triggered_at=_FROZEN_NOW,
+            metadata={},
+        )
+
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
+
+            notifier.send(alert)
+
+        kwargs = mock_post.call_args.kwargs
+        assert isinstance(kwargs["data"], bytes)
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+        payload = json.loads(kwargs["data"])
+        assert payload == notifier._create_payload(alert).to_dict()
+        assert "@here" in payload["content"]
+
+    @pytest.mark.parametrize("include_chart_link", [True, False])
+    def test_rendered_payload_matches_full_encode(self, include_chart_link):
+        """Should splice values into templates with correct JSON escaping."""
+        notifier = DiscordNotifier(
+            webhook_url="https://discord.com/api/webhooks/123/abc",
+            include_chart_link=include_chart_link,
+        )
+        alerts = [
+            Alert(
+                ticker="BRK.B",
+                rule_type="custom",
+                message='Said "sell" \\ now\n__SLOT1__ 📉',
+                severity=AlertSeverity.CRITICAL,
+                current_price=412.5,
+                triggered_at=_FROZEN_NOW,
+                metadata={},
+            ),
+            Alert(
+                ticker="AAPL",
+                rule_type="daily_change",
+                message="Plain message",
+                severity=AlertSeverity.INFO,
+                current_price=165.0,
+                triggered_at=_FROZEN_NOW,
+                metadata={},
+            ),
+        ]
+
+        body = notifier._render_payload(alerts)
+
+        assert json.loads(body) == notifier._create_batch_payload(alerts).to_dict()
+        assert json.loads(notifier._render_payload(alerts[1:])) == (
+            notifier._create_payload(alerts[1]).to_dict()
+        )
+
+    def test_notifiers_share_pooled_session(self):
+        """Should reuse one HTTP session across notifier instances."""
+        first = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/1/a")
+        second = DiscordNotifier(webhook_url="https://discord.com/api/webhooks/2/b")
+
+        assert first._session is second._session
+
+    def test_session_reused_across_sends(self, notifier: DiscordNotifier, sample_alert, discord_responses):
+        """Should send every webhook through one pooled keep-alive session."""
+        notifier.dedupe_window_s = 0  # Repeated identical sends on purpose
+        session = notifier._session
+        adapter = session.get_adapter(notifier.webhook_url)
+
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.return_value = discord_responses.ok
+
+            notifier.send(sample_alert)
+            notifier.send(sample_alert)
+
+        assert mock_post.call_count == 2
+        assert notifier._session is session
+        assert session.get_adapter(notifier.webhook_url) is adapter
+        assert session.headers["Connection"] == "keep-alive"
+
+    def test_rate_limit_handling(self, notifier: DiscordNotifier, sample_alert, discord_responses):
+        """Should handle Discord rate limiting."""
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            # First call returns rate limit, second succeeds
+            mock_post.side_effect = [discord_responses.rate, discord_responses.ok]
 
             with patch("time.sleep"):  # Don't actually sleep
                 result = notifier.send(sample_alert)
@@ -208,9 +466,44 @@ class TestDiscordNotifier:
         # Should retry after rate limit
         assert mock_post.call_count == 2
 
+    def test_local_rate_limiter_prevents_429(self, notifier: DiscordNotifier, sample_alert, discord_responses):
+        """Should throttle bursts locally instead of relying on 429 retries."""
+        notifier.dedupe_window_s = 0  # Repeated identical sends on purpose
+        with patch.object(DiscordNotifier._session, "post") as mock_post, \
+             patch("time.sleep") as mock_sleep:
+            mock_post.return_value = discord_responses.ok
+
+            results = [notifier.send(sample_alert) for _ in range(20)]
+
+        assert all(r.success for r in results)
+        assert mock_post.call_count == 20
+        # Burst of 5 goes straight through, the rest wait for refilled tokens
+        assert mock_sleep.call_count >= 10
+
+    def test_rate_limit_headers_pause_bucket(self, notifier: DiscordNotifier, sample_alert):
+        """Should wait for the reported reset when the remaining budget is 0."""
+        notifier.dedupe_window_s = 0  # Repeated identical sends on purpose
+        exhausted_response = Mock()
+        exhausted_response.status_code = 204
+        exhausted_response.ok = True
+        exhausted_response.headers = {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset-After": "2.5",
+        }
+
+        with patch.object(DiscordNotifier._session, "post") as mock_post, \
+             patch("time.sleep") as mock_sleep:
+            mock_post.return_value = exhausted_response
+
+            notifier.send(sample_alert)
+            mock_sleep.assert_not_called()
+            notifier.send(sample_alert)
+
+        assert mock_sleep.call_args[0][0] == pytest.approx(2.5, abs=0.1)
+
     def test_network_error_handling(self, notifier: DiscordNotifier, sample_alert):
         """Should handle network errors gracefully."""
-        with patch("requests.post") as mock_post:
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
             mock_post.side_effect = ConnectionError("Network unreachable")
 
             result = notifier.send(sample_alert)
@@ -218,6 +511,21 @@ class TestDiscordNotifier:
         assert result.success is False
         assert "Network" in result.error or "Connection" in result.error
 
+    @pytest.mark.parametrize("error,retryable", [
+        (requests.exceptions.ConnectTimeout("connect timed out"), True),
+        (requests.exceptions.ConnectionError("refused"), True),
+        (requests.exceptions.ReadTimeout("read timed out"), False),
+    ])
+    def test_only_unsent_requests_are_retryable(self, notifier: DiscordNotifier, sample_alert, error, retryable):
+        """Should not retry a read timeout, which Discord may already have posted."""
+        with patch.object(DiscordNotifier._session, "post") as mock_post:
+            mock_post.side_effect = error
+
+            result = notifier.send(sample_alert)
+
+        assert result.success is False
+        assert result.retryable is retryable
+
 
 class TestEmailNotifier:
     """Test Email SMTP notifications."""
@@ -243,26 +551,35 @@ class TestEmailNotifier:
             message="AAPL dropped 10% from monthly high. Current: $165.00, High: $183.33",
             severity=AlertSeverity.WARNING,
             current_price=165.00,
-            triggered_at=datetime.now(),
+            triggered_at=_FROZEN_NOW,
             metadata={"threshold": -10, "monthly_high": 183.33},
         )
 
-    def test_send_email_success(self, notifier: EmailNotifier, sample_alert):
-        """Should send email successfully."""
-        with patch("smtplib.SMTP") as mock_smtp:
-            mock_server = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_server
+    def test_send_email_success(self, smtp_sink, sample_alert):
+        """Should deliver email to an SMTP server."""
+        notifier = EmailNotifier(
+            smtp_host=smtp_sink.host,
+            smtp_port=smtp_sink.port,
+            smtp_user="",
+            smtp_password="",
+            from_address="alerts@modo.app",
+            to_addresses=["user@example.com"],
+            use_starttls=False,
+        )
 
-            result = notifier.send(sample_alert)
+        result = notifier.send(sample_alert)
+        notifier.close()
 
         assert result.success is True
         assert result.channel == "email"
-        mock_server.send_message.assert_called_once()
+        assert len(smtp_sink.messages) == 1
+        assert smtp_sink.messages[0].rcpt_tos == ["<user@example.com>"]
+        assert b"AAPL" in smtp_sink.messages[0].content
 
     def test_send_email_failure(self, notifier: EmailNotifier, sample_alert):
         """Should handle SMTP failure."""
         with patch("smtplib.SMTP") as mock_smtp:
-            mock_smtp.return_value.__enter__.side_effect = Exception("SMTP error")
+            mock_smtp.side_effect = Exception("SMTP error")
 
             result = notifier.send(sample_alert)
 
@@ -284,6 +601,24 @@ class TestEmailNotifier:
         assert "AAPL" in body
         assert "$165.00" in body or "165" in body
 
+    def test_email_body_escapes_html(self, notifier: EmailNotifier):
+        """Should HTML-escape alert text in the email body."""
+        alert = Alert(
+            ticker="<script>",
+            rule_type="custom",
+            message="Price < 150 & falling",
+            severity=AlertSeverity.INFO,
+            current_price=145.00,
+            triggered_at=_FROZEN_NOW,
+            metadata={},
+        )
+
+        body = notifier._create_body(alert)
+
+        assert "<script>" not in body
+        assert "&lt;script&gt;" in body
+        assert "Price &lt; 150 &amp; falling" in body
+
     def test_send_to_multiple_recipients(self, sample_alert):
         """Should send to multiple recipients."""
         notifier = EmailNotifier(
@@ -297,7 +632,7 @@ class TestEmailNotifier:
 
         with patch("smtplib.SMTP") as mock_smtp:
             mock_server = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_server
+            mock_smtp.return_value = mock_server
 
             result = notifier.send(sample_alert)
 
@@ -307,12 +642,46 @@ class TestEmailNotifier:
         assert "user1@example.com" in message["To"]
         assert "user2@example.com" in message["To"]
 
+    def test_mixed_domains_share_one_envelope(self, sample_alert):
+        """Should deliver to every domain over a single relay connection."""
+        notifier = EmailNotifier(
+            smtp_host="smtp.gmail.com",
+            smtp_port=587,
+            smtp_user="sender@gmail.com",
+            smtp_password="app-password",
+            from_address="alerts@modo.app",
+            to_addresses=["a@gmail.com", "b@outlook.com", "c@gmail.com"],
+        )
+
+        with patch("smtplib.SMTP") as mock_smtp:
+            mock_server = MagicMock()
+            mock_smtp.return_value = mock_server
+
+            result = notifier.send(sample_alert)
+
+        assert result.success is True
+        assert mock_smtp.call_count == 1
+        mock_server.send_message.assert_called_once()
+        message = mock_server.send_message.call_args[0][0]
+        assert message["To"] == "a@gmail.com, b@outlook.com, c@gmail.com"
+
+    def test_message_has_text_and_html_parts(self, notifier: EmailNotifier, sample_alert):
+        """Should build a multipart/alternative message with text and HTML."""
+        message = notifier._create_message(sample_alert)
+
+        assert message.get_content_type() == "multipart/alternative"
+        assert [part.get_content_type() for part in message.iter_parts()] == [
+            "text/plain",
+            "text/html",
+        ]
+        assert message["From"] == "alerts@modo.app"
+
     def test_authentication_failure(self, notifier: EmailNotifier, sample_alert):
         """Should handle authentication failure."""
         with patch("smtplib.SMTP") as mock_smtp:
             mock_server = MagicMock()
             mock_server.login.side_effect = Exception("Authentication failed")
-            mock_smtp.return_value.__enter__.return_value = mock_server
+            mock_smtp.return_value = mock_server
 
             result = notifier.send(sample_alert)
 
@@ -320,14 +689,184 @@ class TestEmailNotifier:
         assert "Authentication" in result.error or "failed" in result.error.lower()
 
     def test_tls_connection(self, notifier: EmailNotifier, sample_alert):
-        """Should use TLS for secure connection."""
+        """Should use TLS for secure connection, negotiated once per connection."""
         with patch("smtplib.SMTP") as mock_smtp:
             mock_server = MagicMock()
-            mock_smtp.return_value.__enter__.return_value = mock_server
+            mock_smtp.return_value = mock_server
 
-            notifier.send(sample_alert)
+            results = notifier.send_batch([sample_alert] * 10)
 
+        assert all(r.success for r in results)
+        mock_smtp.assert_called_once()
         mock_server.starttls.assert_called_once()
+        mock_server.login.assert_called_once()
+        assert mock_server.send_message.call_count == 10
+
+    def test_smtp_reconnect_on_disconnect(self, notifier: EmailNotifier, sample_alert):
+        """Should reconnect and resend when the cached connection was dropped."""
+        stale_server = MagicMock()
+        stale_server.send_message.side_effect = smtplib.SMTPServerDisconnected()
+        fresh_server = MagicMock()
+
+        with patch("smtplib.SMTP") as mock_smtp:
+            mock_smtp.side_effect = [stale_server, fresh_server]
+
+            result = notifier.send(sample_alert)
+
+        assert result.success is True
+        assert mock_smtp.call_count == 2
+        fresh_server.send_message.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "error,retryable",
+        [
+            (smtplib.SMTPRecipientsRefused({"user@example.com": (550, b"No such user")}), False),
+            (smtplib.SMTPSenderRefused(553, b"Sender rejected", "alerts@modo.app"), False),
+            (smtplib.SMTPDataError(554, b"Message rejected"), False),
+            (smtplib.SMTPDataError(451, b"Try again later"), True),
+            (smtplib.SMTPConnectError(421, b"Too busy"), True),
+            (TimeoutError("timed out"), True),
+            (ConnectionResetError("reset"), True),
+        ],
+    )
+    def test_retryable_only_for_transient_errors(
+        self, notifier: EmailNotifier, sample_alert, error, retryable
+    ):
+        """Should mark dropped connections and 4xx replies retryable, not 5xx."""
+        with patch("smtplib.SMTP") as mock_smtp:
+            mock_smtp.return_value.send_message.side_effect = error
+
+            result = notifier.send(sample_alert)
+
+        assert result.success is False
+        assert result.retryable is retryable
+
+    def test_permanent_rejection_is_not_retried(self, notifier: EmailNotifier, sample_alert):
+        """Should send once and not sleep when the relay refuses with a 550."""
+        refused = smtplib.SMTPRecipientsRefused({"user@example.com": (550, b"No such user")})
+
+        with patch("smtplib.SMTP") as mock_smtp, patch("time.sleep") as mock_sleep:
+            mock_smtp.return_value.send_message.side_effect = refused
+
+            result = notifier.send_with_retry(sample_alert, max_retries=3, retry_delay=5)
+
+        assert result.success is False
+        mock_smtp.return_value.send_message.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_close_quits_connection(self, notifier: EmailNotifier, sample_alert):
+        """Should QUIT the cached connection on close."""
+        with patch("smtplib.SMTP") as mock_smtp:
+            mock_server = MagicMock()
+            mock_smtp.return_value = mock_server
+
+            notifier.send(sample_alert)
+            notifier.close()
+
+        mock_server.quit.assert_called_once()
+
+
+class TestNotifierRetry:
+    """Test retrying transient notification failures."""
+
+    class FlakyNotifier(Notifier):
+        """Notifier that fails a fixed number of times before succeeding."""
+
+        def __init__(self, failures: int, retryable: bool = True):
+            self.failures = failures
+            self.retryable = retryable
+            self.calls = 0
+
+        @classmethod
+        def from_config(cls, config):
+            return cls(failures=config.get("failures", 0))
+
+        def send(self, alert: Alert) -> NotificationResult:
+            self.calls += 1
+            if self.calls <= self.failures:
+                return NotificationResult(
+                    success=False, channel="test", error="boom", retryable=self.retryable
+                )
+            return NotificationResult(success=True, channel="test")
+
+    @pytest.fixture
+    def sample_alert(self):
+        """Create sample alert."""
+        return Alert(
+            ticker="AAPL",
+            rule_type="daily_change",
+            message="AAPL surged",
+            severity=AlertSeverity.INFO,
+            current_price=165.00,
+            triggered_at=_FROZEN_NOW,
+            metadata={},
+        )
+
+    def test_retry_backoff_schedule(self, sample_alert):
+        """Should retry transient failures with exponentially growing delays."""
+        notifier = self.FlakyNotifier(failures=3)
+
+        with patch("time.sleep") as mock_sleep:
+            result = notifier.send_with_retry(sample_alert, max_retries=5, retry_delay=2)
+
+        assert result.success is True
+        assert notifier.calls == 4
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [2, 4, 8]
+
+    def test_gives_up_after_max_retries(self, sample_alert):
+        """Should return the last failure once retries are exhausted."""
+        notifier = self.FlakyNotifier(failures=10)
+
+        with patch("time.sleep"):
+            result = notifier.send_with_retry(sample_alert, max_retries=2, retry_delay=1)
+
+        assert result.success is False
+        assert notifier.calls == 3
+
+    def test_no_retry_for_permanent_failure(self, sample_alert):
+        """Should not retry failures that are not marked retryable."""
+        notifier = self.FlakyNotifier(failures=1, retryable=False)
+
+        with patch("time.sleep") as mock_sleep:
+            result = notifier.send_with_retry(sample_alert)
+
+        assert result.success is False
+        assert notifier.calls == 1
+        mock_sleep.assert_not_called()
+
+    def test_batch_retry_resends_only_failed_alerts(self, sample_alert):
+        """Should retry only the alerts of a batch that failed transiently."""
+        notifier = self.FlakyNotifier(failures=1)  # First alert fails once
+        other = Alert(
+            ticker="MSFT",
+            rule_type="daily_change",
+            message="MSFT surged",
+            severity=AlertSeverity.INFO,
+            current_price=410.00,
+            triggered_at=_FROZEN_NOW,
+            metadata={},
+        )
+
+        with patch.object(notifier, "send_batch", wraps=notifier.send_batch) as send_batch, \
+             patch("time.sleep") as mock_sleep:
+            results = notifier.send_batch_with_retry([sample_alert, other], retry_delay=2)
+
+        assert [r.success for r in results] == [True, True]
+        assert [c[0][0] for c in send_batch.call_args_list] == [[sample_alert, other], [sample_alert]]
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [2]
+
+    def test_deadline_stops_retries(self, sample_alert):
+        """Should not start a retry whose delay would run past the deadline."""
+        notifier = self.FlakyNotifier(failures=10)
+
+        with patch("time.sleep") as mock_sleep, patch("time.monotonic", return_value=100.0):
+            result = notifier.send_with_retry(
+                sample_alert, max_retries=5, retry_delay=2, deadline=107.0
+            )
+
+        assert result.success is False
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [2, 4]
+        assert notifier.calls == 3
 
 
 class TestNotifierFactory:
@@ -371,3 +910,40 @@ class TestNotifierFactory:
 
         with pytest.raises(ValueError, match="Unknown notifier type"):
             NotifierFactory.create(config)
+
+    def test_register_custom_notifier(self, monkeypatch):
+        """Should dispatch to notifiers registered by type name."""
+        from src.notifiers.base import NotifierFactory
+
+        monkeypatch.setattr(NotifierFactory, "_REGISTRY", dict(NotifierFactory._REGISTRY))
+
+        @NotifierFactory.register("console")
+        class ConsoleNotifier(Notifier):
+            def __init__(self, prefix: str):
+                self.prefix = prefix
+
+            @classmethod
+            def from_config(cls, config):
+                return cls(prefix=config.get("prefix", ""))
+
+            def send(self, alert):
+                return NotificationResult(success=True, channel="console")
+
+        notifier = NotifierFactory.create({"type": "console", "prefix": ">"})
+
+        assert isinstance(notifier, ConsoleNotifier)
+        assert notifier.prefix == ">"
+
+    def test_register_requires_from_config(self, monkeypatch):
+        """Should reject a notifier without from_config at registration time."""
+        from src.notifiers.base import NotifierFactory
+
+        monkeypatch.setattr(NotifierFactory, "_REGISTRY", dict(NotifierFactory._REGISTRY))
+
+        with pytest.raises(TypeError, match="from_config"):
+            @NotifierFactory.register("incomplete")
+            class IncompleteNotifier(Notifier):
+                def send(self, alert):
+                    return NotificationResult(success=True, channel="incomplete")
+
+        assert "incomplete" not in NotifierFactory._REGISTRY
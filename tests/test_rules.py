@@ -6,7 +6,7 @@ Tests for alert rule evaluation.
 import pytest
 from datetime import datetime
 
-from src.rules.engine import RuleEngine, Alert, AlertSeverity
+from src.rules.engine import RuleEngine, RuleSet, Alert, AlertSeverity
 from src.rules.types import (
     MonthlyHighDropRule,
     MonthlyLowRiseRule,
@@ -36,6 +36,20 @@ class TestAlert:
         assert alert.ticker == "AAPL"
         assert alert.severity == AlertSeverity.WARNING
 
+    def test_alert_uses_slots(self):
+        """Should store alert fields in slots rather than a per-instance dict."""
+        alert = Alert(
+            ticker="AAPL",
+            rule_type="daily_change",
+            message="AAPL surged",
+            severity=AlertSeverity.INFO,
+            current_price=165.00,
+            triggered_at=datetime.now(),
+            metadata={},
+        )
+
+        assert not hasattr(alert, "__dict__")
+
     def test_alert_severity_levels(self):
         """Should support different severity levels."""
         assert AlertSeverity.INFO.value < AlertSeverity.WARNING.value
@@ -121,6 +135,20 @@ class TestMonthlyHighDropRule:
         assert len(critical_alerts) == 1
         assert critical_alerts[0].severity == AlertSeverity.CRITICAL
 
+    @pytest.mark.parametrize(
+        "threshold,expected",
+        [
+            (-3, AlertSeverity.INFO),
+            (-9.9, AlertSeverity.INFO),
+            (-10, AlertSeverity.WARNING),
+            (-15, AlertSeverity.CRITICAL),
+            (-30, AlertSeverity.CRITICAL),
+        ],
+    )
+    def test_severity_band_boundaries(self, rule, threshold, expected):
+        """Should map thresholds to severity bands inclusively at each bound."""
+        assert rule._get_severity(threshold) == expected
+
     def test_alert_message_format(self, rule, stock_data, historical_data):
         """Should format alert message correctly."""
         alerts = rule.evaluate(stock_data, historical_data)
@@ -130,6 +158,58 @@ class TestMonthlyHighDropRule:
             assert "monthly high" in alert.message.lower()
             assert "$" in alert.message  # Price formatting
 
+    @pytest.mark.parametrize("current_price", [185.00, 175.75, 166.50, 150.00, 92.50, 10.00])
+    def test_many_thresholds_match_linear_scan(self, stock_data, historical_data, current_price):
+        """Should trigger exactly the thresholds a linear scan would, in order."""
+        thresholds = [-t / 2 for t in range(1, 101, 3)] + [-5, -10]
+        rule = MonthlyHighDropRule(thresholds=thresholds)
+        stock_data.current_price = current_price
+        drop_pct = historical_data.drop_from_high(current_price)
+
+        alerts = rule.evaluate(stock_data, historical_data)
+
+        expected = [t for t in sorted(thresholds, reverse=True) if drop_pct <= t]
+        assert [a.metadata["threshold"] for a in alerts] == expected
+
+    def test_alerts_have_independent_metadata(self, stock_data, historical_data):
+        """Should give each triggered alert its own metadata dict."""
+        rule = MonthlyHighDropRule(thresholds=[-5, -10])
+        stock_data.current_price = 150.00
+
+        first, second = rule.evaluate(stock_data, historical_data)
+        first.metadata["threshold"] = 0
+
+        assert second.metadata["threshold"] == -10
+        assert second.metadata["monthly_high"] == historical_data.monthly_high
+
+    @pytest.mark.parametrize(
+        "thresholds,current_price,monthly_high",
+        [
+            ([-5], 175.75, 185.00),  # exactly -5%
+            ([-10], 166.50, 185.00),  # exactly -10%
+            ([-7.3], 92.70, 100.00),  # exactly -7.3%
+            ([-0.1], 0.999, 1.00),  # exactly -0.1%
+            ([3], 103.00, 100.00),  # exactly +3%
+            ([-5], 175.76, 185.00),  # just short of -5%
+            ([-5], 10.00, 0.00),  # no monthly high
+        ],
+    )
+    def test_may_trigger_never_misses_alerts(
+        self, stock_data, historical_data, thresholds, current_price, monthly_high
+    ):
+        """Should only rule out data for which evaluate() finds nothing."""
+        rule = MonthlyHighDropRule(thresholds=thresholds)
+        stock_data.current_price = current_price
+        historical_data.monthly_high = monthly_high
+
+        if rule.evaluate(stock_data, historical_data):
+            assert rule.may_trigger(current_price, monthly_high)
+
+    def test_may_trigger_rejects_small_drops(self, rule):
+        """Should rule out prices clearly above the easiest threshold."""
+        assert not rule.may_trigger(180.00, 185.00)
+        assert not MonthlyHighDropRule(thresholds=[]).may_trigger(10.00, 185.00)
+
 
 class TestMonthlyLowRiseRule:
     """Test monthly low rise rule evaluation."""
@@ -497,6 +577,22 @@ class TestDailyChangeRule:
 
         assert "8.3" in alerts[0].message or "8.33" in alerts[0].message
 
+    def test_unknown_direction_never_triggers(self):
+        """Should not trigger for an unrecognized direction."""
+        rule = DailyChangeRule(threshold=5, direction="sideways")
+        stock_data = StockData(
+            ticker="TSLA",
+            current_price=300.00,
+            previous_close=240.00,
+            open_price=242.00,
+            high=301.00,
+            low=241.00,
+            volume=100_000_000,
+            timestamp=datetime.now(),
+        )
+
+        assert rule.evaluate(stock_data, None) == []
+
 
 class TestVolumeSpikeRule:
     """Test volume spike rule evaluation."""
@@ -718,6 +814,104 @@ class TestCustomRule:
         with pytest.raises(ValueError):
             CustomRule(name="Invalid", condition="price ??? 100")
 
+    def test_incomplete_condition_raises_error(self):
+        """Should reject conditions that pass the character check but do not parse."""
+        with pytest.raises(ValueError, match="Invalid condition syntax"):
+            CustomRule(name="Incomplete", condition="price <")
+
+    def test_condition_parsed_once(self, mocker):
+        """Should compile the condition at construction, not on every evaluation."""
+        import ast
+
+        rule = CustomRule(name="Buy signal", condition="price < 150")
+        parse = mocker.spy(ast, "parse")
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=145.00,
+            previous_close=150.00,
+            open_price=149.00,
+            high=151.00,
+            low=144.00,
+            volume=50_000_000,
+            timestamp=datetime.now(),
+        )
+
+        for _ in range(3):
+            assert len(rule.evaluate(stock_data, None)) == 1
+
+        parse.assert_not_called()
+
+    def test_identical_conditions_share_compiled_function(self):
+        """Should compile a condition once for all rules that use it."""
+        first = CustomRule(name="Buy signal", condition="price < 123.45")
+        second = CustomRule(name="Other user", condition="price < 123.45")
+
+        assert first._fn is second._fn
+
+    @pytest.mark.parametrize(
+        "condition,expected",
+        [
+            ("close - price > 4", True),
+            ("price * 2 >= 290", True),
+            ("140 < price < 150", True),
+            ("140 < price < 145", False),
+            ("not price > 150", True),
+            ("-daily_change_pct > 3", True),
+            ("volume / 1000000 == 50", True),
+            ("int(price) == 145", True),
+            ("price < 150 and (volume < 1 or high > 150)", True),
+        ],
+    )
+    def test_compiled_condition_semantics(self, condition, expected):
+        """Should evaluate arithmetic, chained and boolean conditions like Python."""
+        rule = CustomRule(name="Check", condition=condition)
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=145.00,
+            previous_close=150.00,  # -3.3% daily change
+            open_price=149.00,
+            high=151.00,
+            low=144.00,
+            volume=50_000_000,
+            timestamp=datetime.now(),
+        )
+
+        assert bool(rule.evaluate(stock_data, None)) is expected
+
+    @pytest.mark.parametrize(
+        "condition",
+        [
+            "price.real > 1",
+            "rand() > 1",
+            "price > foo",
+            "__import__('os')",
+            "open('file') > 1",
+            "price < 'abc'",
+            "price in [1, 2]",
+            "(lambda: price)()",
+        ],
+    )
+    def test_unsupported_condition_raises_error(self, condition):
+        """Should reject attribute access, unknown functions, names and literals."""
+        with pytest.raises(ValueError):
+            CustomRule(name="Invalid", condition=condition)
+
+    def test_historical_condition_without_history(self):
+        """Should not trigger when a condition needs missing historical data."""
+        rule = CustomRule(name="Break monthly high", condition="price > monthly_high")
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=190.00,
+            previous_close=185.00,
+            open_price=186.00,
+            high=191.00,
+            low=185.00,
+            volume=60_000_000,
+            timestamp=datetime.now(),
+        )
+
+        assert rule.evaluate(stock_data, None) == []
+
     def test_condition_with_historical_data(self):
         """Should evaluate conditions using historical data."""
         rule = CustomRule(
@@ -800,6 +994,43 @@ class TestRuleEngine:
         assert "monthly_high_drop" in rule_types
         assert "daily_change" in rule_types
 
+    def test_alerts_share_evaluation_timestamp(self, engine: RuleEngine):
+        """Should stamp every alert with the timestamp passed to evaluate_rules."""
+        now = datetime(2024, 1, 15, 12, 0, 0)
+        rules = [
+            UserRule(
+                id=1,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-5, -10]},
+                enabled=True,
+            ),
+            UserRule(id=2, user_id=1, rule_type="daily_change", parameters={}, enabled=True),
+        ]
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=165.00,
+            previous_close=155.00,
+            open_price=156.00,
+            high=166.00,
+            low=155.00,
+            volume=50_000_000,
+            timestamp=now,
+        )
+        historical_data = HistoricalData(
+            ticker="AAPL",
+            monthly_high=185.00,
+            monthly_low=160.00,
+            avg_volume_20d=45_000_000,
+            prices=[],
+            volumes=[],
+        )
+
+        alerts = engine.evaluate_rules(rules, stock_data, historical_data, now=now)
+
+        assert len(alerts) == 3
+        assert all(a.triggered_at == now for a in alerts)
+
     def test_skip_disabled_rules(self, engine: RuleEngine):
         """Should skip disabled rules."""
         rules = [
@@ -861,3 +1092,328 @@ class TestRuleEngine:
 
         with pytest.raises(ValueError, match="Unknown rule type"):
             engine.create_rule(user_rule)
+
+    def test_prefilter_skips_dormant_rules(self, engine: RuleEngine, mocker):
+        """Should not evaluate rules whose cheap precondition fails."""
+        rules = [
+            UserRule(
+                id=1,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-10]},
+                enabled=True,
+            ),
+            UserRule(
+                id=2,
+                user_id=1,
+                rule_type="volume_spike",
+                parameters={"multiplier": 3.0},
+                enabled=True,
+            ),
+        ]
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=180.00,  # -2.7% from high
+            previous_close=179.00,
+            open_price=179.00,
+            high=181.00,
+            low=178.00,
+            volume=50_000_000,  # ~1.1x average
+            timestamp=datetime.now(),
+        )
+        historical_data = HistoricalData(
+            ticker="AAPL",
+            monthly_high=185.00,
+            monthly_low=160.00,
+            avg_volume_20d=45_000_000,
+            prices=[],
+            volumes=[],
+        )
+        drop_evaluate = mocker.spy(MonthlyHighDropRule, "evaluate")
+        volume_evaluate = mocker.spy(VolumeSpikeRule, "evaluate")
+
+        alerts = engine.evaluate_rules(rules, stock_data, historical_data)
+
+        assert alerts == []
+        drop_evaluate.assert_not_called()
+        volume_evaluate.assert_not_called()
+
+    def test_reuses_rule_instances_for_identical_parameters(self, engine: RuleEngine, mocker):
+        """Should build each distinct rule configuration only once."""
+        rule = UserRule(
+            id=1,
+            user_id=1,
+            rule_type="daily_change",
+            parameters={"threshold": 5, "direction": "both"},
+            enabled=True,
+        )
+        same_config = UserRule(
+            id=2,
+            user_id=2,
+            rule_type="daily_change",
+            parameters={"direction": "both", "threshold": 5},
+            enabled=True,
+        )
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=165.00,
+            previous_close=155.00,
+            open_price=156.00,
+            high=166.00,
+            low=155.00,
+            volume=50_000_000,
+            timestamp=datetime.now(),
+        )
+        create_rule = mocker.spy(engine, "create_rule")
+
+        alerts = engine.evaluate_rules([rule, same_config], stock_data, None)
+        alerts += engine.evaluate_rules([rule], stock_data, None)
+
+        assert len(alerts) == 3
+        assert create_rule.call_count == 1
+
+    def test_rule_cache_evicts_least_recently_used(self, mocker):
+        """Should keep at most rule_cache_size built rules, dropping the oldest."""
+        engine = RuleEngine(rule_cache_size=2)
+        rules = [
+            UserRule(
+                id=i,
+                user_id=1,
+                rule_type="price_target",
+                parameters={"reference_price": 100.0 + i},
+            )
+            for i in range(3)
+        ]
+        create_rule = mocker.spy(engine, "create_rule")
+
+        engine._get_rule(rules[0])
+        engine._get_rule(rules[1])
+        engine._get_rule(rules[0])  # refresh: rules[1] is now the oldest
+        engine._get_rule(rules[2])
+        engine._get_rule(rules[0])
+        engine._get_rule(rules[1])
+
+        assert len(engine._rule_cache) == 2
+        assert create_rule.call_count == 4
+
+    @pytest.mark.parametrize("max_workers", [1, 2, 4])
+    def test_evaluate_rules_batch_matches_per_ticker(self, engine: RuleEngine, max_workers):
+        """Should produce the same alerts per ticker as evaluate_rules."""
+        rule_specs = [
+            ("monthly_high_drop", {"thresholds": [-5, -10, -20]}, True),
+            ("monthly_low_rise", {"thresholds": [5, 10]}, True),
+            ("daily_change", {"threshold": 5, "direction": "down"}, True),
+            ("volume_spike", {"multiplier": 2.0}, True),
+            ("price_target", {"reference_price": 100.0, "thresholds": [-10, 10]}, True),
+            ("custom", {"name": "Cheap", "condition": "price < 90"}, True),
+            ("daily_change", {"threshold": 1}, False),
+        ]
+        rules = [
+            UserRule(
+                id=i,
+                user_id=1,
+                rule_type=rule_type,
+                parameters=parameters,
+                enabled=enabled,
+            )
+            for i, (rule_type, parameters, enabled) in enumerate(rule_specs, start=1)
+        ]
+        # (price, previous close, volume, monthly high, monthly low, avg volume)
+        rows = [
+            (85.0, 95.0, 90_000_000, 110.0, 80.0, 30_000_000),
+            (120.0, 110.0, 10_000_000, 125.0, 100.0, 30_000_000),
+            (100.0, 100.0, 30_000_000, 100.0, 100.0, 30_000_000),
+            (50.0, 0.0, 5_000_000, 0.0, 0.0, 0.0),
+            (70.0, 80.0, 70_000_000, None, None, None),
+        ]
+        stock_data_list = []
+        historical_data_list = []
+        for i, (price, previous_close, volume, high, low, avg_volume) in enumerate(rows):
+            stock_data_list.append(
+                StockData(
+                    ticker=f"T{i}",
+                    current_price=price,
+                    previous_close=previous_close,
+                    open_price=previous_close,
+                    high=price,
+                    low=price,
+                    volume=volume,
+                    timestamp=datetime.now(),
+                )
+            )
+            historical_data_list.append(
+                None if high is None else HistoricalData(
+                    ticker=f"T{i}",
+                    monthly_high=high,
+                    monthly_low=low,
+                    avg_volume_20d=avg_volume,
+                    prices=[],
+                    volumes=[],
+                )
+            )
+
+        def summary(alerts):
+            return [(a.rule_type, a.message, a.severity, a.metadata) for a in alerts]
+
+        batch = engine.evaluate_rules_batch(
+            rules, stock_data_list, historical_data_list, max_workers=max_workers
+        )
+
+        assert len(batch) == len(rows)
+        for alerts, sd, hd in zip(batch, stock_data_list, historical_data_list):
+            assert summary(alerts) == summary(engine.evaluate_rules(rules, sd, hd))
+        assert any(batch)
+
+    def test_compile_rules_merges_monthly_high_drops(self, engine: RuleEngine, mocker):
+        """Should compute the drop once and keep each rule type's alert order."""
+        rules = [
+            UserRule(
+                id=1,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-20]},
+                enabled=True,
+            ),
+            UserRule(id=2, user_id=1, rule_type="daily_change", parameters={}, enabled=True),
+            UserRule(
+                id=3,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-30, -5]},
+                enabled=True,
+            ),
+            UserRule(
+                id=4,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-1]},
+                enabled=False,
+            ),
+        ]
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=120.00,  # -35.1% from high
+            previous_close=121.00,
+            open_price=121.00,
+            high=122.00,
+            low=119.00,
+            volume=50_000_000,
+            timestamp=datetime.now(),
+        )
+        historical_data = HistoricalData(
+            ticker="AAPL",
+            monthly_high=185.00,
+            monthly_low=115.00,
+            avg_volume_20d=45_000_000,
+            prices=[],
+            volumes=[],
+        )
+
+        compiled = engine.compile_rules(rules)
+        drop_from_high = mocker.spy(HistoricalData, "drop_from_high")
+        alerts = engine.evaluate_rules(compiled, stock_data, historical_data)
+
+        assert [r.id for r in compiled] == [1, 2, 4]  # disabled rules pass through
+        assert drop_from_high.call_count == 1
+        # Same order as evaluating rule 1, then rule 3
+        assert [a.metadata["threshold"] for a in alerts] == [-20, -5, -30]
+        assert [a.severity for a in alerts] == [
+            AlertSeverity.CRITICAL,
+            AlertSeverity.INFO,
+            AlertSeverity.CRITICAL,
+        ]
+        separate = engine.evaluate_rules(rules, stock_data, historical_data)
+        for rule_type in ("monthly_high_drop", "daily_change"):
+            assert [a.message for a in alerts if a.rule_type == rule_type] == [
+                a.message for a in separate if a.rule_type == rule_type
+            ]
+
+    def test_keep_order_is_not_a_rule_parameter(self, engine: RuleEngine):
+        """Should ignore keep_order in stored parameters; only compile_rules sets it."""
+        user_rule = UserRule(
+            id=1,
+            user_id=1,
+            rule_type="monthly_high_drop",
+            parameters={"thresholds": [-20, -5], "keep_order": True},
+        )
+        stock_data = StockData(
+            ticker="AAPL",
+            current_price=120.00,  # -35.1% from high
+            previous_close=121.00,
+            open_price=121.00,
+            high=122.00,
+            low=119.00,
+            volume=50_000_000,
+            timestamp=datetime.now(),
+        )
+        historical_data = HistoricalData(
+            ticker="AAPL",
+            monthly_high=185.00,
+            monthly_low=115.00,
+            avg_volume_20d=45_000_000,
+            prices=[],
+            volumes=[],
+        )
+
+        alerts = engine.evaluate_rules([user_rule], stock_data, historical_data)
+
+        assert [a.metadata["threshold"] for a in alerts] == [-5, -20]
+
+    def test_rule_set_caches_compiled_rules(self):
+        """Should merge drop rules once per symbol selection."""
+        rules = [
+            UserRule(
+                id=1,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-20]},
+            ),
+            UserRule(
+                id=2,
+                user_id=1,
+                rule_type="monthly_high_drop",
+                parameters={"thresholds": [-5]},
+                symbol_id=10,
+            ),
+        ]
+
+        rule_set = RuleSet(rules)
+        selected = rule_set.for_symbol(10)
+
+        assert len(selected) == 1
+        assert selected[0].parameters["thresholds"] == [-20, -5]
+        assert rule_set.for_symbol(10) is selected
+        assert rule_set.for_symbol(20) == [rules[0]]
+
+    def test_compile_rules_without_drop_rules(self, engine: RuleEngine):
+        """Should return the rules unchanged with fewer than two drop rules."""
+        rules = [
+            UserRule(id=1, user_id=1, rule_type="daily_change", parameters={}),
+            UserRule(id=2, user_id=1, rule_type="monthly_high_drop", parameters={}),
+        ]
+
+        assert engine.compile_rules(rules) is rules
+
+    def test_rule_set_partitions_enabled_rules_by_symbol(self):
+        """Should drop disabled rules and select global plus symbol rules."""
+        rules = [
+            UserRule(id=1, user_id=1, rule_type="daily_change", parameters={}, enabled=True),
+            UserRule(id=2, user_id=1, rule_type="volume_spike", parameters={}, enabled=False),
+            UserRule(
+                id=3,
+                user_id=1,
+                rule_type="custom",
+                parameters={"condition": "price < 150"},
+                enabled=True,
+                symbol_id=10,
+            ),
+            UserRule(id=4, user_id=1, rule_type="monthly_high_drop", parameters={}, enabled=True),
+        ]
+
+        rule_set = RuleSet(rules)
+
+        assert len(rule_set) == 3
+        assert [r.id for r in rule_set.for_symbol(10)] == [1, 3, 4]
+        assert [r.id for r in rule_set.for_symbol(20)] == [1, 4]
+        assert rule_set.for_symbol(10) is rule_set.for_symbol(10)
+